@@ -0,0 +1,143 @@
+from posts.models import Group, User
+from posts.utils import attach_comment_counts
+
+MAX_LIMIT = 100
+
+# Поле ответа -> поле модели, которое нужно загрузить для него (None —
+# поле вычисляется отдельным запросом).
+POST_FIELDS = {
+    'id': 'id',
+    'text': 'text',
+    'pub_date': 'pub_date',
+    'author': 'author',
+    'group': 'group',
+    'image': 'image',
+    'comment_count': None,
+}
+COMMENT_FIELDS = {
+    'id': 'id',
+    'post': 'post',
+    'author': 'author',
+    'text': 'text',
+    'created': 'created',
+}
+
+
+class ApiError(Exception):
+    """Ошибка в параметрах запроса; отдаётся клиенту с кодом 400."""
+
+
+def parse_list(value, allowed, name):
+    """Разбирает ``?fields=`` или ``?expand=``: список через запятую."""
+    if not value:
+        return []
+    items = [item.strip() for item in value.split(',') if item.strip()]
+    unknown = sorted(set(items) - set(allowed))
+    if unknown:
+        raise ApiError(f'Неизвестные значения {name}: {", ".join(unknown)}')
+    return items
+
+
+def parse_limit(value, default):
+    if not value:
+        return default
+    try:
+        limit = int(value)
+    except ValueError:
+        raise ApiError('limit должен быть целым числом')
+    if not 1 <= limit <= MAX_LIMIT:
+        raise ApiError(f'limit должен быть от 1 до {MAX_LIMIT}')
+    return limit
+
+
+def columns(fields, available, always=()):
+    """Поля модели для ``only()``: запрошенные и нужные курсору."""
+    names = {available[field] for field in fields if available[field]}
+    return sorted(names.union(always))
+
+
+def serialize_user(user):
+    return {
+        'id': user.pk,
+        'username': user.username,
+        'full_name': user.get_full_name(),
+    }
+
+
+def serialize_group(group):
+    return {
+        'id': group.pk,
+        'slug': group.slug,
+        'title': group.title,
+    }
+
+
+def expanded(model, ids, serialize, only):
+    """Связанные объекты одним запросом: ``{id: данные}``."""
+    ids = {pk for pk in ids if pk is not None}
+    if not ids:
+        return {}
+    objects = model.objects.only(*only).in_bulk(ids)
+    return {pk: serialize(obj) for pk, obj in objects.items()}
+
+
+def expand_related(objects, rows, expand):
+    """Заменяет id автора и группы в ``rows`` объектами из пакетных выборок.
+    """
+    if 'author' in expand:
+        users = expanded(
+            User, (obj.author_id for obj in objects), serialize_user,
+            ('username', 'first_name', 'last_name')
+        )
+        for row in rows:
+            row['author'] = users.get(row['author'])
+    if 'group' in expand:
+        groups = expanded(
+            Group, (obj.group_id for obj in objects), serialize_group,
+            ('slug', 'title')
+        )
+        for row in rows:
+            row['group'] = groups.get(row['group'])
+    return rows
+
+
+def serialize_posts(posts, fields, expand):
+    """Посты в виде словарей только с полями ``fields``.
+
+    Счётчики комментариев, авторы и группы загружаются пакетно, по одному
+    запросу на всю страницу, и только если клиент их запросил.
+    """
+    if 'comment_count' in fields:
+        posts = attach_comment_counts(posts)
+    values = {
+        'id': lambda post: post.pk,
+        'text': lambda post: post.text,
+        'pub_date': lambda post: post.pub_date,
+        'author': lambda post: post.author_id,
+        'group': lambda post: post.group_id,
+        'image': lambda post: post.image.url if post.image else None,
+        'comment_count': lambda post: post.comment_count,
+    }
+    rows = [
+        {field: values[field](post) for field in fields} for post in posts
+    ]
+    return expand_related(posts, rows, [
+        name for name in expand if name in fields
+    ])
+
+
+def serialize_comments(comments, fields, expand):
+    values = {
+        'id': lambda comment: comment.pk,
+        'post': lambda comment: comment.post_id,
+        'author': lambda comment: comment.author_id,
+        'text': lambda comment: comment.text,
+        'created': lambda comment: comment.created,
+    }
+    rows = [
+        {field: values[field](comment) for field in fields}
+        for comment in comments
+    ]
+    return expand_related(comments, rows, [
+        name for name in expand if name in fields
+    ])
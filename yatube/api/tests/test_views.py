@@ -0,0 +1,164 @@
+from http import HTTPStatus
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from api import urls as api_urls
+from posts.models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+# Бюджет SQL-запросов на запрос к каждому URL из api/urls.py
+# с полным набором полей и раскрытием автора и группы.
+QUERY_BUDGETS = {
+    'index': 4,
+    'post': 4,
+    'comments': 3,
+    'group_posts': 5,
+    'follow_index': 7,
+    'profile': 4,
+    'profile_posts': 5,
+}
+
+
+class ApiTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.reader = User.objects.create_user(username='reader')
+        cls.author = User.objects.create_user(
+            username='author', first_name='Лев', last_name='Толстой'
+        )
+        cls.group = Group.objects.create(
+            title='Группа', slug='group', description='Описание'
+        )
+        Follow.objects.create(user=cls.reader, author=cls.author)
+        cls.posts = [
+            Post.objects.create(
+                text=f'post {i}', author=cls.author,
+                group=cls.group if i % 2 else None
+            )
+            for i in range(5)
+        ]
+        for i in range(3):
+            Comment.objects.create(
+                post=cls.posts[-1], author=cls.reader, text=f'comment {i}'
+            )
+
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(self.reader)
+
+    def get(self, name, kwargs=None, **params):
+        return self.client.get(reverse(f'api:{name}', kwargs=kwargs), params)
+
+    def test_index_pages_by_cursor(self):
+        """Лента отдаётся страницами по курсору от новых к старым."""
+        first = self.get('index', limit=3).json()
+        self.assertEqual(
+            [post['text'] for post in first['results']],
+            ['post 4', 'post 3', 'post 2']
+        )
+        second = self.get('index', limit=3, cursor=first['next_cursor'])
+        self.assertEqual(
+            [post['text'] for post in second.json()['results']],
+            ['post 1', 'post 0']
+        )
+        self.assertIsNone(second.json()['next_cursor'])
+
+    def test_sparse_fields_and_expand(self):
+        """В ответе только запрошенные поля, автор и группа раскрыты."""
+        data = self.get(
+            'group_posts', {'slug': self.group.slug},
+            fields='id,author,group', expand='author,group'
+        ).json()
+        post = data['results'][0]
+        self.assertEqual(set(post), {'id', 'author', 'group'})
+        self.assertEqual(post['author'], {
+            'id': self.author.pk,
+            'username': 'author',
+            'full_name': 'Лев Толстой',
+        })
+        self.assertEqual(post['group']['slug'], 'group')
+
+    def test_comment_count_only_when_requested(self):
+        """Счётчик комментариев считается, только если он запрошен."""
+        with CaptureQueriesContext(connection) as queries:
+            self.get('index', fields='id,text')
+        self.assertFalse(any(
+            'posts_comment' in query['sql'] for query in queries
+        ))
+        data = self.get('index', fields='id,comment_count').json()
+        self.assertEqual(data['results'][0]['comment_count'], 3)
+
+    def test_post_detail_with_comments(self):
+        """Пост отдаётся с первой страницей комментариев по запросу."""
+        post = self.posts[-1]
+        data = self.get(
+            'post', {'post_id': post.pk}, expand='author,comments'
+        ).json()
+        self.assertEqual(data['author']['username'], 'author')
+        self.assertEqual(
+            [comment['text'] for comment in data['comments']],
+            ['comment 2', 'comment 1', 'comment 0']
+        )
+        self.assertEqual(data['comments'][0]['author']['username'], 'reader')
+
+    def test_follow_feed_and_profile(self):
+        """Лента подписок и профиль учитывают текущего пользователя."""
+        data = self.get('follow_index').json()
+        self.assertEqual(len(data['results']), 5)
+        profile = self.get('profile', {'username': 'author'}).json()
+        self.assertTrue(profile['following'])
+        self.assertEqual(profile['posts_count'], 5)
+        self.assertEqual(profile['followers_count'], 1)
+
+    def test_follow_feed_requires_login(self):
+        response = Client().get(reverse('api:follow_index'))
+        self.assertEqual(response.status_code, HTTPStatus.UNAUTHORIZED)
+
+    def test_errors_are_json(self):
+        """Ошибки параметров и отсутствующие объекты отдаются в JSON."""
+        response = self.get('index', fields='id,password')
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+        self.assertIn('password', response.json()['error'])
+        response = self.get('post', {'post_id': 999})
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+        self.assertEqual(response.json(), {'error': 'Не найдено'})
+
+    def test_read_only(self):
+        response = self.client.post(reverse('api:index'))
+        self.assertEqual(
+            response.status_code, HTTPStatus.METHOD_NOT_ALLOWED
+        )
+
+    def test_urls_fit_query_budget(self):
+        """Каждый URL API укладывается в объявленный бюджет SQL-запросов."""
+        self.assertEqual(
+            {pattern.name for pattern in api_urls.urlpatterns},
+            set(QUERY_BUDGETS)
+        )
+        values = {
+            'post_id': self.posts[-1].pk,
+            'slug': self.group.slug,
+            'username': self.author.username,
+        }
+        for pattern in api_urls.urlpatterns:
+            kwargs = {
+                key: values[key] for key in pattern.pattern.converters
+            }
+            url = reverse(f'api:{pattern.name}', kwargs=kwargs)
+            expand = 'author' if pattern.name == 'comments' else (
+                'author,group'
+            )
+            with self.subTest(url=url):
+                with CaptureQueriesContext(connection) as queries:
+                    response = self.client.get(url, {'expand': expand})
+                self.assertEqual(response.status_code, HTTPStatus.OK)
+                self.assertLessEqual(
+                    len(queries), QUERY_BUDGETS[pattern.name],
+                    '\n'.join(query['sql'] for query in queries)
+                )
@@ -0,0 +1,23 @@
+from django.urls import path
+
+from . import views
+
+app_name = 'api'
+
+urlpatterns = [
+    path('posts/', views.index, name='index'),
+    path('posts/<int:post_id>/', views.post_detail, name='post'),
+    path(
+        'posts/<int:post_id>/comments/',
+        views.post_comments,
+        name='comments'
+    ),
+    path('groups/<slug:slug>/posts/', views.group_posts, name='group_posts'),
+    path('follow/posts/', views.follow_posts, name='follow_index'),
+    path('users/<str:username>/', views.profile, name='profile'),
+    path(
+        'users/<str:username>/posts/',
+        views.profile_posts,
+        name='profile_posts'
+    ),
+]
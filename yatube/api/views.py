@@ -0,0 +1,160 @@
+from functools import wraps
+
+from django.conf import settings
+from django.http import Http404, JsonResponse
+from django.shortcuts import get_object_or_404
+from django.views.decorators.http import require_safe
+
+from posts import follows
+from posts.models import Comment, Group, Post, TimelineEntry, User
+from posts.paginators import CursorPaginator
+from posts.stats import get_stats
+from posts.utils import COMMENT_ORDERING
+
+from .serializers import (
+    COMMENT_FIELDS, POST_FIELDS, ApiError, columns, parse_limit, parse_list,
+    serialize_comments, serialize_posts, serialize_user
+)
+
+POST_ORDERING = ('-pub_date', '-id')
+
+
+def api_view(view):
+    """Только чтение; ошибки отдаются в JSON, а не HTML-страницей."""
+    @require_safe
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        try:
+            return view(request, *args, **kwargs)
+        except ApiError as error:
+            return JsonResponse({'error': str(error)}, status=400)
+        except Http404:
+            return JsonResponse({'error': 'Не найдено'}, status=404)
+    return wrapper
+
+
+def list_params(request, available, expandable=('author', 'group')):
+    fields = parse_list(request.GET.get('fields'), available, 'fields')
+    return (
+        fields or list(available),
+        parse_list(request.GET.get('expand'), expandable, 'expand'),
+        parse_limit(request.GET.get('limit'), settings.POSTS_PAGINATOR),
+    )
+
+
+def page_response(results, page):
+    return JsonResponse({
+        'results': results,
+        'next_cursor': page.next_cursor,
+        'previous_cursor': page.previous_cursor,
+    })
+
+
+def post_list(request, queryset):
+    fields, expand, limit = list_params(request, POST_FIELDS)
+    queryset = queryset.only(
+        *columns(fields, POST_FIELDS, always=('id', 'pub_date'))
+    )
+    page = CursorPaginator(queryset, limit, POST_ORDERING).get_page(
+        request.GET.get('cursor')
+    )
+    return page_response(
+        serialize_posts(page.object_list, fields, expand), page
+    )
+
+
+def comments_page(post_id, cursor, limit, only=None):
+    comments = Comment.objects.filter(post_id=post_id)
+    if only:
+        comments = comments.only(*only)
+    return CursorPaginator(comments, limit, COMMENT_ORDERING).get_page(
+        cursor
+    )
+
+
+@api_view
+def index(request):
+    return post_list(request, Post.objects.all())
+
+
+@api_view
+def group_posts(request, slug):
+    group = get_object_or_404(Group.objects.only('id'), slug=slug)
+    return post_list(request, Post.objects.filter(group=group))
+
+
+@api_view
+def profile(request, username):
+    author = get_object_or_404(
+        User.objects.select_related('stats'), username=username
+    )
+    stats = get_stats(author)
+    data = serialize_user(author)
+    data.update(
+        posts_count=stats.posts_count,
+        followers_count=stats.followers_count,
+        following_count=stats.following_count,
+        following=follows.is_following(request.user.pk, author.pk),
+    )
+    return JsonResponse(data)
+
+
+@api_view
+def profile_posts(request, username):
+    author = get_object_or_404(User.objects.only('id'), username=username)
+    return post_list(request, Post.objects.filter(author=author))
+
+
+@api_view
+def follow_posts(request):
+    if not request.user.is_authenticated:
+        return JsonResponse({'error': 'Требуется авторизация'}, status=401)
+    fields, expand, limit = list_params(request, POST_FIELDS)
+    entries = TimelineEntry.objects.filter(user=request.user).only(
+        'pub_date', 'post_id'
+    )
+    page = CursorPaginator(
+        entries, limit, ('-pub_date', '-post_id')
+    ).get_page(request.GET.get('cursor'))
+    posts = Post.objects.only(
+        *columns(fields, POST_FIELDS, always=('id',))
+    ).in_bulk([entry.post_id for entry in page])
+    posts = [posts[entry.post_id] for entry in page if entry.post_id in posts]
+    return page_response(serialize_posts(posts, fields, expand), page)
+
+
+@api_view
+def post_detail(request, post_id):
+    fields = parse_list(request.GET.get('fields'), POST_FIELDS, 'fields')
+    fields = fields or list(POST_FIELDS)
+    expand = parse_list(
+        request.GET.get('expand'), ('author', 'group', 'comments'), 'expand'
+    )
+    post = get_object_or_404(
+        Post.objects.only(*columns(fields, POST_FIELDS, always=('id',))),
+        pk=post_id
+    )
+    data = serialize_posts([post], fields, expand)[0]
+    if 'comments' in expand:
+        page = comments_page(post.pk, None, settings.COMMENTS_PAGINATOR)
+        data['comments'] = serialize_comments(
+            page.object_list, list(COMMENT_FIELDS), ['author']
+        )
+        data['comments_next_cursor'] = page.next_cursor
+    return JsonResponse(data)
+
+
+@api_view
+def post_comments(request, post_id):
+    if not Post.objects.filter(pk=post_id).exists():
+        raise Http404
+    fields, expand, limit = list_params(
+        request, COMMENT_FIELDS, expandable=('author',)
+    )
+    page = comments_page(
+        post_id, request.GET.get('cursor'), limit,
+        columns(fields, COMMENT_FIELDS, always=('id', 'created'))
+    )
+    return page_response(
+        serialize_comments(page.object_list, fields, expand), page
+    )
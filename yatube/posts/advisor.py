@@ -0,0 +1,64 @@
+import re
+
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from . import benchmark
+
+# Строки плана SQLite, которые стоит показать: полный обход таблицы
+# без индекса и сортировка во временном B-дереве. Обход виртуальной
+# таблицы FTS идёт по её собственному индексу и замечанием не считается.
+FULL_SCAN = re.compile(r'^SCAN (TABLE )?(?P<table>\w+)(?P<rest>.*)$')
+TEMP_BTREE = re.compile(r'USE TEMP B-TREE FOR (?P<what>.+)$')
+
+
+def explain(sql):
+    """Строки ``EXPLAIN QUERY PLAN`` для запроса SQLite."""
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+        return [row[-1] for row in cursor.fetchall()]
+
+
+def problems(plan):
+    """Замечания к плану: полные обходы и временные B-деревья."""
+    found = []
+    for line in plan:
+        scan = FULL_SCAN.match(line)
+        if scan and not re.search(r'USING|VIRTUAL TABLE', scan['rest']):
+            found.append(f'полный обход {scan.group("table")}')
+        btree = TEMP_BTREE.search(line)
+        if btree:
+            found.append(f'временное B-дерево для {btree.group("what")}')
+    return found
+
+
+def analyze(namespace='posts'):
+    """Проверяет планы SELECT-запросов каждого маршрута ``namespace``.
+
+    Возвращает ``{маршрут: [(sql, план, замечания), ...]}``; одинаковые
+    запросы внутри маршрута проверяются один раз. Кэш очищается перед
+    каждым запросом, чтобы в разбор попали и запросы холодного кэша.
+    """
+    client = benchmark.viewer_client()
+    kwargs = benchmark.url_kwargs()
+    report = {}
+    for name, pattern in benchmark.routes():
+        if not name.startswith(f'{namespace}:'):
+            continue
+        url, method, data, author = benchmark.prepare(name, pattern, kwargs)
+        if author is not None:
+            benchmark.toggle_follow(name, author)
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            benchmark.call(client, url, method, data)
+        seen = set()
+        report[name] = []
+        for query in queries:
+            sql = query['sql']
+            if not sql.lstrip().upper().startswith('SELECT') or sql in seen:
+                continue
+            seen.add(sql)
+            plan = explain(sql)
+            report[name].append((sql, plan, problems(plan)))
+    return report
@@ -0,0 +1,244 @@
+import contextlib
+import datetime as dt
+import math
+import random
+import time
+
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+
+from about import urls as about_urls
+from api import urls as api_urls
+from posts import urls as posts_urls
+from users import urls as users_urls
+
+from .importer import Importer, rebuild_steps
+from .models import Follow, Group, Post, User
+
+# Маршруты, которые обходит бенчмарк: (пространство имён, модуль urls).
+URLCONFS = (
+    ('posts', posts_urls),
+    ('', users_urls),
+    ('about', about_urls),
+    ('api', api_urls),
+)
+# Маршруты, которые нельзя проверить GET-запросом.
+METHODS = {
+    'posts:add_comment': ('post', {'text': 'Комментарий из бенчмарка'}),
+}
+SEARCH_QUERY = {'q': 'пост'}
+BENCH_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'bench-routes',
+    }
+}
+WORDS = (
+    'пост', 'день', 'город', 'дорога', 'кофе', 'книга', 'погода', 'утро',
+    'вечер', 'музыка', 'работа', 'отпуск', 'море', 'горы', 'новость',
+)
+START = dt.datetime(2020, 1, 1, tzinfo=dt.timezone.utc)
+
+
+def seed(users=200, groups=10, posts=2000, comments=5000, follows=2000,
+         random_seed=0):
+    """Заполняет пустую базу синтетическими данными.
+
+    Данные загружаются через ``Importer``, а производные таблицы
+    пересобираются так же, как после ``import_data``. Первый пользователь
+    (``bench_0``) — читатель с правами персонала, от имени которого
+    выполняются запросы.
+    """
+    generator = random.Random(random_seed)
+    usernames = [f'bench_{i}' for i in range(users)]
+    records = [{'model': 'users', 'username': name} for name in usernames]
+    records += [
+        {'model': 'groups', 'title': f'Группа {i}', 'slug': f'group-{i}'}
+        for i in range(groups)
+    ]
+    records += [
+        {
+            'model': 'posts',
+            'id': i + 1,
+            'author': usernames[i % users],
+            'group': f'group-{i % groups}' if i % 3 else None,
+            'text': ' '.join(generator.choices(WORDS, k=30)),
+            'pub_date': (START + dt.timedelta(minutes=i)).isoformat(),
+        }
+        for i in range(posts)
+    ]
+    records += [
+        {
+            'model': 'comments',
+            'post': generator.randint(1, posts),
+            'author': generator.choice(usernames),
+            'text': ' '.join(generator.choices(WORDS, k=10)),
+        }
+        for _ in range(comments)
+    ]
+    pairs = {
+        (generator.randrange(users), generator.randrange(1, users))
+        for _ in range(follows)
+    }
+    pairs.update((0, author) for author in range(1, min(users, 21)))
+    records += [
+        {'model': 'follows', 'user': usernames[user],
+         'author': usernames[author]}
+        for user, author in sorted(pairs)
+    ]
+    importer = Importer()
+    for record in records:
+        importer.add(record)
+    importer.flush()
+    for title, step in rebuild_steps(with_thumbnails=False):
+        step()
+    User.objects.filter(username=usernames[0]).update(is_staff=True)
+    return importer.loaded
+
+
+def url_kwargs():
+    """Значения параметров URL, взятые из засеянных данных."""
+    viewer = User.objects.get(username='bench_0')
+    post = Post.objects.filter(author=viewer).order_by('-pk').first()
+    return {
+        'slug': Group.objects.order_by('pk').first().slug,
+        'username': viewer.username,
+        'post_id': post.pk,
+        'model': 'posts',
+    }
+
+
+def routes():
+    """Все именованные маршруты приложений в виде (имя, шаблон)."""
+    for namespace, urlconf in URLCONFS:
+        for pattern in urlconf.urlpatterns:
+            name = f'{namespace}:{pattern.name}' if namespace else (
+                pattern.name
+            )
+            yield name, pattern
+
+
+def percentile(values, share):
+    """Процентиль по методу ближайшего ранга."""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(share * len(ordered)) - 1)]
+
+
+def toggle_follow(name, author):
+    """Готовит подписку так, чтобы follow/unfollow каждый раз что-то делали.
+    """
+    viewer = User.objects.get(username='bench_0')
+    if name == 'posts:profile_follow':
+        Follow.objects.filter(user=viewer, author=author).delete()
+    elif name == 'posts:profile_unfollow':
+        Follow.objects.get_or_create(user=viewer, author=author)
+
+
+def prepare(name, pattern, kwargs):
+    """URL, метод и данные запроса к маршруту; автор для follow/unfollow."""
+    kwargs = {key: kwargs[key] for key in pattern.pattern.converters}
+    author = None
+    if name in ('posts:profile_follow', 'posts:profile_unfollow'):
+        author = User.objects.get(username='bench_1')
+        kwargs['username'] = author.username
+    method, data = METHODS.get(name, ('get', SEARCH_QUERY))
+    return reverse(name, kwargs=kwargs), method, data, author
+
+
+def call(client, url, method, data):
+    """Выполняет запрос и дочитывает тело, в том числе потоковое."""
+    response = getattr(client, method)(url, data)
+    if response.streaming:
+        return response, b''.join(response.streaming_content)
+    return response, response.content
+
+
+def measure(name, pattern, client, kwargs, iterations=20, warmup=2):
+    """Замеряет один маршрут: задержки, число запросов к БД и размер ответа.
+    """
+    url, method, data, author = prepare(name, pattern, kwargs)
+    timings = []
+    for iteration in range(warmup + iterations):
+        if author is not None:
+            toggle_follow(name, author)
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            response, body = call(client, url, method, data)
+            elapsed = time.perf_counter() - started
+        if iteration >= warmup:
+            timings.append(elapsed * 1000)
+    return {
+        'url': url,
+        'method': method.upper(),
+        'status': response.status_code,
+        'p50_ms': round(percentile(timings, 0.5), 3),
+        'p95_ms': round(percentile(timings, 0.95), 3),
+        'queries': len(queries),
+        'bytes': len(body),
+    }
+
+
+def viewer_client():
+    client = Client()
+    client.force_login(User.objects.get(username='bench_0'))
+    return client
+
+
+def run(iterations=20, warmup=2):
+    """Обходит все маршруты от имени ``bench_0`` и возвращает замеры.
+
+    Реплики отключены: засеяна только база ``default``, и запросы
+    считаются по её соединению.
+    """
+    client = viewer_client()
+    kwargs = url_kwargs()
+    with override_settings(REPLICA_DATABASES=[]):
+        return {
+            name: measure(name, pattern, client, kwargs, iterations, warmup)
+            for name, pattern in routes()
+        }
+
+
+@contextlib.contextmanager
+def temporary_database(**dataset):
+    """Временная тестовая база с синтетическими данными и локальным кэшем.
+
+    Отдаёт словарь с числом загруженных строк по моделям; после выхода
+    база удаляется, а настройки кэша возвращаются.
+    """
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(
+        verbosity=0, autoclobber=True, serialize=False
+    )
+    try:
+        with override_settings(CACHES=BENCH_CACHES):
+            yield seed(**dataset)
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+def compare(results, baseline, tolerance=0.2):
+    """Список регрессий относительно сохранённого базового прогона.
+
+    Задержка и размер ответа сравниваются с допуском ``tolerance``,
+    число запросов к БД — строго: любой лишний запрос считается регрессией.
+    """
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        if current['queries'] > previous['queries']:
+            regressions.append(
+                f'{name}: запросов {previous["queries"]} -> '
+                f'{current["queries"]}'
+            )
+        for metric in ('p95_ms', 'bytes'):
+            if current[metric] > previous[metric] * (1 + tolerance):
+                regressions.append(
+                    f'{name}: {metric} {previous[metric]} -> '
+                    f'{current[metric]}'
+                )
+    return regressions
@@ -0,0 +1,65 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+
+VERSION_KEY = 'posts:version:{}'
+CARD_KEY = (
+    'posts:card:{template}:{post}:{updated}:{author}:{comments}:{own}'
+)
+
+
+def version_timeout():
+    """Срок жизни ключей версий и записей, собранных на версиях.
+
+    Общий кэш видят все воркеры: версия, поднятая в одном процессе, сразу
+    инвалидирует записи остальных, и срок не нужен. У LocMem кэш свой
+    в каждом процессе, правка в соседнем воркере здешнюю версию не меняет,
+    поэтому версии живут не дольше ``POSTS_LOCAL_VERSION_TIMEOUT``: затем
+    берётся новая, и ленты, граф подписок и ETag собираются заново.
+    """
+    if isinstance(caches['default'], (LocMemCache, DummyCache)):
+        return settings.POSTS_LOCAL_VERSION_TIMEOUT
+    return None
+
+
+def get_version(name):
+    """Текущая версия именованного набора данных для ключей кэша."""
+    key = VERSION_KEY.format(name)
+    version = cache.get(key)
+    if version is None:
+        # Начальное значение от времени, чтобы после вытеснения ключа
+        # версия не совпала с одной из уже использованных.
+        cache.add(key, int(time.time() * 1000), version_timeout())
+        version = cache.get(key)
+    return version
+
+
+def bump_version(name):
+    """Инвалидирует все ключи, построенные на версии ``name``."""
+    key = VERSION_KEY.format(name)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        return get_version(name)
+
+
+def card_key(post, user, template_name):
+    """Ключ отрендеренной карточки поста.
+
+    Карточка зависит от самого поста (его ``updated`` сдвигается и при
+    смене сообщества или готовности миниатюры), имени автора, которое
+    пост не отслеживает, числа комментариев и того, смотрит ли её автор —
+    ему показывается ссылка на редактирование. Ленты выбирают автора
+    через ``select_related``, так что имя не стоит запроса.
+    """
+    return CARD_KEY.format(
+        template=template_name,
+        post=post.pk,
+        updated=post.updated.timestamp(),
+        author=post.author.username,
+        comments=getattr(post, 'comment_count', 0),
+        own=int(getattr(user, 'pk', None) == post.author_id),
+    )
@@ -0,0 +1,56 @@
+import hashlib
+
+from .cache import get_version
+from .models import UserStats
+
+
+def _etag(request, *parts):
+    """Хэш адреса страницы, зрителя и версий данных, из которых она собрана.
+    """
+    raw = ':'.join(
+        str(part)
+        for part in (request.get_full_path(), request.user.pk) + parts
+    )
+    return hashlib.md5(raw.encode()).hexdigest()
+
+
+def feed_etag(request, *args, **kwargs):
+    """Валидатор лент: версия ``posts`` меняется при любой правке постов,
+    комментариев, групп и при готовности миниатюр."""
+    return _etag(request, get_version('posts'))
+
+
+def author_etag(request, username, *args, **kwargs):
+    """Валидатор страниц автора: к версии лент добавляются подписки зрителя
+    (кнопка «Подписаться»), пересчёт рекомендаций и счётчики автора
+    из карточки."""
+    return _author_etag(request, username)
+
+
+def post_etag(request, username, post_id):
+    """Валидатор страницы поста: к валидатору автора добавляется версия
+    ``views:<id>``, которую запись буфера просмотров растит только
+    у этого поста. Число на странице между записями может отставать
+    на незаписанные просмотры; живой счётчик в валидатор не входит,
+    иначе каждый визит менял бы ETag. Форма комментария несёт
+    CSRF-токен, который меняется при входе, поэтому в валидатор входит
+    и кука токена: иначе после повторного входа браузер получил бы 304
+    со старым токеном, и отправка комментария вернула бы 403."""
+    return _author_etag(
+        request, username, get_version(f'views:{post_id}'),
+        request.META.get('CSRF_COOKIE')
+    )
+
+
+def _author_etag(request, username, *parts):
+    counters = UserStats.objects.filter(user__username=username).values_list(
+        'posts_count', 'followers_count', 'following_count'
+    ).first()
+    return _etag(
+        request,
+        get_version('posts'),
+        get_version(f'follows:{request.user.pk}'),
+        get_version('recommendations'),
+        counters,
+        *parts
+    )
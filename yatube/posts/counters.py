@@ -0,0 +1,142 @@
+import atexit
+import logging
+import threading
+import time
+from collections import Counter, defaultdict
+from functools import wraps
+
+from django.conf import settings
+from django.db import DatabaseError, connections, transaction
+from django.db.models import F
+
+from .cache import bump_version
+from .models import Post
+
+logger = logging.getLogger(__name__)
+
+# Просмотры, ещё не записанные в базу: id поста -> прирост. Буфер свой
+# у каждого процесса; сбрасывается по порогу ``POST_VIEWS_FLUSH_THRESHOLD``,
+# по интервалу ``POST_VIEWS_FLUSH_INTERVAL`` и при штатном выходе процесса,
+# так что падение воркера теряет не больше одного буфера. Интервал
+# отсчитывает фоновый таймер, который ставит первый просмотр в пустой
+# буфер: иначе простаивающий воркер держал бы просмотры до следующего
+# запроса.
+_pending = Counter()
+_lock = threading.Lock()
+_last_flush = time.monotonic()
+_timer = None
+# База, для которой накоплен буфер. Тестовый раннер подменяет и затем
+# возвращает имя базы, и просмотры тестовых постов не должны попасть
+# в настоящую базу при выходе процесса.
+_database = None
+
+
+def _database_name():
+    return connections['default'].settings_dict['NAME']
+
+
+def _flush_on_timer():
+    global _timer
+    with _lock:
+        _timer = None
+    try:
+        flush()
+    finally:
+        # Соединение с БД принадлежит потоку таймера.
+        connections['default'].close()
+
+
+def increment(post_id, count=1):
+    global _database, _timer
+    with _lock:
+        if not _pending:
+            _database = _database_name()
+            if _timer is None:
+                _timer = threading.Timer(
+                    settings.POST_VIEWS_FLUSH_INTERVAL, _flush_on_timer
+                )
+                _timer.daemon = True
+                _timer.start()
+        _pending[post_id] += count
+        due = (
+            sum(_pending.values()) >= settings.POST_VIEWS_FLUSH_THRESHOLD
+            or time.monotonic() - _last_flush
+            >= settings.POST_VIEWS_FLUSH_INTERVAL
+        )
+    if due:
+        flush()
+
+
+def pending(post_id):
+    with _lock:
+        return _pending.get(post_id, 0)
+
+
+def views(post):
+    """Записанные в базу просмотры плюс ещё не сброшенные из буфера."""
+    return post.views + pending(post.pk)
+
+
+def flush():
+    """Записывает буфер одним UPDATE на каждую встречающуюся величину
+    прироста. Возвращает число обновлённых постов."""
+    global _last_flush
+    with _lock:
+        batch = dict(_pending)
+        database = _database
+        _pending.clear()
+        _last_flush = time.monotonic()
+    if not batch:
+        return 0
+    if database != _database_name():
+        logger.info('Просмотры собраны для другой базы, сброс пропущен')
+        return 0
+    by_delta = defaultdict(list)
+    for post_id, delta in batch.items():
+        by_delta[delta].append(post_id)
+    # База указана явно: запись счётчиков не должна закреплять за
+    # случайным читателем основную базу через роутер реплик.
+    try:
+        with transaction.atomic(using='default'):
+            for delta, post_ids in by_delta.items():
+                Post.objects.using('default').filter(pk__in=post_ids).update(
+                    views=F('views') + delta
+                )
+    except DatabaseError:
+        logger.exception('Не удалось записать просмотры, вернём в буфер')
+        with _lock:
+            _pending.update(batch)
+        return 0
+    # Валидатор страницы поста меняется только у записанных постов.
+    for post_id in batch:
+        bump_version(f'views:{post_id}')
+    return len(batch)
+
+
+def clear():
+    global _last_flush, _timer
+    with _lock:
+        _pending.clear()
+        _last_flush = time.monotonic()
+        if _timer is not None:
+            _timer.cancel()
+            _timer = None
+
+
+def counts_views(view):
+    """Считает просмотр поста ``post_id`` по каждому GET с ответом 200
+    или 304.
+
+    Ставится снаружи ``@condition``: повторный визит, которому отдан
+    304 без вызова самого представления, тоже просмотр.
+    """
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        response = view(request, *args, **kwargs)
+        if request.method == 'GET' and response.status_code in (200, 304):
+            increment(kwargs['post_id'])
+        return response
+    return wrapper
+
+
+atexit.register(flush)
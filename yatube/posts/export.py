@@ -0,0 +1,132 @@
+import csv
+import datetime as dt
+import io
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from .models import Comment, Follow, Group, Post, User
+
+CHUNK_SIZE = 2000
+FORMATS = ('jsonl', 'csv')
+
+
+class Export:
+    """Описание выгрузки: модель, поля (колонка -> lookup) и фильтры."""
+
+    def __init__(self, model, fields, date_field=None, author_field=None):
+        self.model = model
+        self.fields = fields
+        self.date_field = date_field
+        self.author_field = author_field
+
+    @property
+    def columns(self):
+        return list(self.fields)
+
+
+EXPORTS = {
+    'users': Export(User, {
+        'id': 'id',
+        'username': 'username',
+        'first_name': 'first_name',
+        'last_name': 'last_name',
+        'email': 'email',
+        'date_joined': 'date_joined',
+    }),
+    'groups': Export(Group, {
+        'id': 'id',
+        'title': 'title',
+        'slug': 'slug',
+        'description': 'description',
+    }),
+    'posts': Export(Post, {
+        'id': 'id',
+        'author': 'author__username',
+        'group': 'group__slug',
+        'text': 'text',
+        'pub_date': 'pub_date',
+        'image': 'image',
+    }, date_field='pub_date', author_field='author__username'),
+    'comments': Export(Comment, {
+        'id': 'id',
+        'post': 'post_id',
+        'author': 'author__username',
+        'text': 'text',
+        'created': 'created',
+    }, date_field='created', author_field='author__username'),
+    'follows': Export(Follow, {
+        'id': 'id',
+        'user': 'user__username',
+        'author': 'author__username',
+    }, author_field='author__username'),
+}
+
+
+def parse_moment(value):
+    """Дата или дата-время из строки ISO 8601 как aware datetime."""
+    if not value:
+        return None
+    moment = parse_datetime(value)
+    if moment is None:
+        day = parse_date(value)
+        if day is None:
+            raise ValueError(f'Неверная дата: {value}')
+        moment = dt.datetime.combine(day, dt.time.min)
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment, timezone.utc)
+    return moment
+
+
+def rows(name, since=None, until=None, author=None, chunk_size=CHUNK_SIZE):
+    """Строки выгрузки пачками по первичному ключу.
+
+    Каждая пачка — отдельный запрос ``WHERE id > last ORDER BY id LIMIT``,
+    поэтому память и время на пачку не зависят от размера таблицы.
+    """
+    export = EXPORTS[name]
+    queryset = export.model.objects.order_by('pk')
+    if export.date_field and since:
+        queryset = queryset.filter(**{f'{export.date_field}__gte': since})
+    if export.date_field and until:
+        queryset = queryset.filter(**{f'{export.date_field}__lt': until})
+    if export.author_field and author:
+        queryset = queryset.filter(**{export.author_field: author})
+    # Ключ курсора выбирается отдельной колонкой: колонки выгрузки могут
+    # идти в любом порядке и не обязаны включать id.
+    lookups = ['pk', *export.fields.values()]
+    last_pk = None
+    while True:
+        chunk = queryset
+        if last_pk is not None:
+            chunk = chunk.filter(pk__gt=last_pk)
+        chunk = list(chunk.values_list(*lookups)[:chunk_size])
+        if not chunk:
+            return
+        for row in chunk:
+            yield row[1:]
+        last_pk = chunk[-1][0]
+
+
+def lines(name, fmt='jsonl', **filters):
+    """Строки файла выгрузки в формате ``jsonl`` или ``csv``."""
+    columns = EXPORTS[name].columns
+    if fmt == 'csv':
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(columns)
+        for row in rows(name, **filters):
+            writer.writerow(row)
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        yield buffer.getvalue()
+        return
+    for row in rows(name, **filters):
+        record = {'model': name}
+        record.update(zip(columns, row))
+        yield json.dumps(
+            record, cls=DjangoJSONEncoder, ensure_ascii=False
+        ) + '\n'
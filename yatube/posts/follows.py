@@ -0,0 +1,87 @@
+import threading
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+
+from .cache import get_version
+from .models import Follow
+
+# Граф подписок в памяти процесса: id пользователя -> (версия, отсортированный
+# массив id авторов). Версия ``follows:{id}`` растёт при каждой подписке
+# и отписке. С общим кэшем (``YATUBE_SHARED_CACHE``) устаревший массив любого
+# процесса перечитывается при следующем обращении; с LocMem версия живёт
+# не дольше ``POSTS_LOCAL_VERSION_TIMEOUT``, и столько же массив может
+# не видеть подписок, сделанных через другой воркер.
+_followees = OrderedDict()
+_lock = threading.Lock()
+
+
+def followees(user_id):
+    """Отсортированный массив id авторов, на которых подписан пользователь.
+    """
+    if user_id is None:
+        return array('q')
+    version = get_version(f'follows:{user_id}')
+    with _lock:
+        cached = _followees.get(user_id)
+        if cached is not None and cached[0] == version:
+            _followees.move_to_end(user_id)
+            return cached[1]
+    ids = array('q', Follow.objects.filter(user=user_id).order_by(
+        'author_id'
+    ).values_list('author_id', flat=True))
+    with _lock:
+        _followees[user_id] = (version, ids)
+        _followees.move_to_end(user_id)
+        while len(_followees) > settings.FOLLOW_GRAPH_USERS:
+            _followees.popitem(last=False)
+    return ids
+
+
+def _contains(ids, author_id):
+    position = bisect_left(ids, author_id)
+    return position < len(ids) and ids[position] == author_id
+
+
+def is_following(user_id, author_id):
+    if user_id is None or user_id == author_id:
+        return False
+    return _contains(followees(user_id), author_id)
+
+
+def following_many(user_id, author_ids):
+    """Те из ``author_ids``, на кого подписан пользователь, за одно чтение
+    графа вместо запроса на каждого автора."""
+    ids = followees(user_id)
+    return {
+        author_id for author_id in author_ids if _contains(ids, author_id)
+    }
+
+
+def follow(user, author):
+    """Подписывает, если подписки ещё нет; повторная подписка — без записи.
+    """
+    if user == author or is_following(user.pk, author.pk):
+        return False
+    try:
+        with transaction.atomic():
+            Follow.objects.create(user=user, author=author)
+    except IntegrityError:
+        # Подписку успел создать параллельный запрос.
+        return False
+    return True
+
+
+def unfollow(user, author):
+    # Сигналы post_delete (лента, счётчики, версия графа) срабатывают
+    # и при удалении через queryset.
+    deleted, _ = Follow.objects.filter(user=user, author=author).delete()
+    return bool(deleted)
+
+
+def clear():
+    with _lock:
+        _followees.clear()
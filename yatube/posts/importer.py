@@ -0,0 +1,281 @@
+import json
+from operator import attrgetter
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from . import search, stats, thumbnails, timeline, trending
+from .cache import bump_version
+from .models import Comment, Follow, Group, Post, User
+
+# Порядок сброса буферов: сначала то, на что ссылаются остальные.
+MODELS = {
+    'users': User,
+    'groups': Group,
+    'posts': Post,
+    'comments': Comment,
+    'follows': Follow,
+}
+ORDER = tuple(MODELS)
+# Уникальный ключ строки: по нему пачка сверяется с базой. Постам
+# и комментариям id назначает ``assign_ids``.
+KEYS = {
+    'users': attrgetter('username'),
+    'groups': attrgetter('slug'),
+    'follows': attrgetter('user_id', 'author_id'),
+}
+# Поля с auto_now_add: ``bulk_create`` заменяет их текущим временем.
+DATE_FIELDS = {
+    'posts': 'pub_date',
+    'comments': 'created',
+}
+# Не больше параметров на запрос, чем допускают старые сборки SQLite.
+QUERY_BATCH = 500
+
+
+def moment(value):
+    return parse_datetime(value) if value else timezone.now()
+
+
+def chunks(items, size=QUERY_BATCH):
+    items = list(items)
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+class Importer:
+    """Загрузка JSONL пачками через ``bulk_create``.
+
+    Строки копятся в буферах по моделям; когда любой буфер заполнен,
+    все буферы сбрасываются в порядке ``ORDER`` в одной транзакции.
+    Внешние ключи разрешаются по словарям username -> id и slug -> id,
+    которые пополняются после каждой пачки пользователей и групп,
+    и по словарю id поста в источнике -> id в базе: при импорте
+    в непустую базу занятые id постов и комментариев заменяются новыми.
+    Сигналы при ``bulk_create`` не отправляются, поэтому производные
+    данные пересобираются отдельно (см. команду ``import_data``).
+    """
+
+    def __init__(self, batch_size=5000):
+        self.batch_size = batch_size
+        self.buffers = {name: [] for name in ORDER}
+        self.loaded = dict.fromkeys(ORDER, 0)
+        self.skipped = dict.fromkeys(ORDER, 0)
+        self.users = dict(User.objects.values_list('username', 'pk'))
+        self.groups = dict(Group.objects.values_list('slug', 'pk'))
+        self.post_ids = {}
+        self.unusable_password = make_password(None)
+
+    def add(self, record):
+        name = record.get('model')
+        if name not in self.buffers:
+            raise ValueError(f'Неизвестная модель: {name}')
+        self.buffers[name].append(record)
+        if len(self.buffers[name]) >= self.batch_size:
+            self.flush()
+
+    def load(self, lines):
+        for line in lines:
+            line = line.strip()
+            if line:
+                self.add(json.loads(line))
+        self.flush()
+
+    def flush(self):
+        with transaction.atomic():
+            for name in ORDER:
+                records, self.buffers[name] = self.buffers[name], []
+                if records:
+                    objects = list(filter(None, (
+                        getattr(self, f'build_{name[:-1]}')(record)
+                        for record in records
+                    )))
+                    if name in DATE_FIELDS:
+                        objects = self.assign_ids(name, objects)
+                    else:
+                        objects = self.drop_conflicts(name, objects)
+                    self.skipped[name] += len(records) - len(objects)
+                    self.save(name, objects)
+
+    def taken(self, name, keys):
+        """Ключи из ``keys``, которые уже заняты в базе."""
+        if name == 'users':
+            return {key for key in keys if key in self.users}
+        if name == 'groups':
+            return {key for key in keys if key in self.groups}
+        taken = set()
+        for chunk in chunks(keys):
+            if name == 'follows':
+                users, authors = zip(*chunk)
+                taken.update(
+                    pair for pair in Follow.objects.filter(
+                        user__in=set(users), author__in=set(authors)
+                    ).values_list('user_id', 'author_id')
+                    if pair in keys
+                )
+            else:
+                taken.update(MODELS[name].objects.filter(
+                    pk__in=chunk
+                ).values_list('pk', flat=True))
+        return taken
+
+    def drop_conflicts(self, name, objects):
+        """Отбрасывает строки, чей ключ уже есть в базе или встречался
+        в пачке раньше. Такие строки считаются пропущенными, а не
+        загруженными, поэтому ``ignore_conflicts`` не нужен."""
+        key = KEYS[name]
+        keys = {key(obj) for obj in objects} - {None}
+        seen = self.taken(name, keys)
+        fresh = []
+        for obj in objects:
+            obj_key = key(obj)
+            if obj_key is not None:
+                if obj_key in seen:
+                    continue
+                seen.add(obj_key)
+            fresh.append(obj)
+        return fresh
+
+    def assign_ids(self, name, objects):
+        """Назначает постам и комментариям id в этой базе.
+
+        Свободный id источника сохраняется, занятый чужой строкой
+        заменяется следующим за наибольшим, так что строки базы
+        не перезаписываются и комментарии не цепляются к чужим постам.
+        Строки без id получают новый. Повтор id источника — дубль,
+        он пропускается.
+        """
+        known = self.post_ids if name == 'posts' else {}
+        fresh = []
+        sources = set()
+        for obj in objects:
+            if obj.source_id is not None:
+                if obj.source_id in sources or obj.source_id in known:
+                    continue
+                sources.add(obj.source_id)
+            fresh.append(obj)
+        kept = sources - self.taken(name, sources)
+        model = MODELS[name]
+        last = max(
+            model.objects.aggregate(last=Max('pk'))['last'] or 0,
+            max(kept, default=0)
+        )
+        for obj in fresh:
+            if obj.source_id in kept:
+                obj.pk = obj.source_id
+            else:
+                last += 1
+                obj.pk = last
+            if name == 'posts' and obj.source_id is not None:
+                self.post_ids[obj.source_id] = obj.pk
+        return fresh
+
+    def save(self, name, objects):
+        model = MODELS[name]
+        date_field = DATE_FIELDS.get(name)
+        if date_field:
+            dates = [getattr(obj, date_field) for obj in objects]
+        model.objects.bulk_create(objects, batch_size=QUERY_BATCH)
+        if date_field:
+            # auto_now_add подставил текущее время; даты источника
+            # возвращаются одним UPDATE на пачку.
+            for obj, date in zip(objects, dates):
+                setattr(obj, date_field, date)
+            model.objects.bulk_update(
+                objects, [date_field], batch_size=QUERY_BATCH
+            )
+        self.loaded[name] += len(objects)
+        if name == 'users':
+            self.users.update(User.objects.filter(
+                username__in=[user.username for user in objects]
+            ).values_list('username', 'pk'))
+        elif name == 'groups':
+            self.groups.update(Group.objects.filter(
+                slug__in=[group.slug for group in objects]
+            ).values_list('slug', 'pk'))
+
+    def build_user(self, record):
+        return User(
+            username=record['username'],
+            first_name=record.get('first_name', ''),
+            last_name=record.get('last_name', ''),
+            email=record.get('email', ''),
+            password=record.get('password') or self.unusable_password,
+            date_joined=moment(record.get('date_joined')),
+        )
+
+    def build_group(self, record):
+        return Group(
+            title=record['title'],
+            slug=record['slug'],
+            description=record.get('description', ''),
+        )
+
+    def build_post(self, record):
+        author_id = self.users.get(record.get('author'))
+        if author_id is None:
+            return None
+        post = Post(
+            text=record['text'],
+            author_id=author_id,
+            group_id=self.groups.get(record.get('group')),
+            image=record.get('image') or None,
+            pub_date=moment(record.get('pub_date')),
+        )
+        post.source_id = record.get('id')
+        return post
+
+    def build_comment(self, record):
+        author_id = self.users.get(record.get('author'))
+        # Комментарий ссылается на id поста в источнике; посты, которых
+        # нет в импорте, в этой базе неизвестны.
+        post_id = self.post_ids.get(record.get('post'))
+        if author_id is None or post_id is None:
+            return None
+        comment = Comment(
+            post_id=post_id,
+            author_id=author_id,
+            text=record['text'],
+            created=moment(record.get('created')),
+        )
+        comment.source_id = record.get('id')
+        return comment
+
+    def build_follow(self, record):
+        user_id = self.users.get(record.get('user'))
+        author_id = self.users.get(record.get('author'))
+        if user_id is None or author_id is None or user_id == author_id:
+            return None
+        return Follow(user_id=user_id, author_id=author_id)
+
+
+def generate_all_thumbnails():
+    """Строит миниатюры всех картинок; возвращает число картинок."""
+    images = Post.objects.exclude(image='').exclude(
+        image__isnull=True
+    ).values_list('image', flat=True)
+    total = 0
+    for name in images.iterator():
+        thumbnails.generate(name)
+        total += 1
+    return total
+
+
+def rebuild_steps(with_thumbnails=True):
+    """Шаги пересборки данных, которые обычно ведут сигналы моделей."""
+    steps = [
+        ('счётчики', stats.recount_all),
+        ('ленты подписок', timeline.rebuild),
+        ('тренды', trending.rebuild),
+        ('поисковый индекс', lambda: (
+            search.rebuild('post', Post.objects.all()),
+            search.rebuild('comment', Comment.objects.all()),
+        )),
+    ]
+    if with_thumbnails:
+        steps.append(('миниатюры', generate_all_thumbnails))
+    steps.append(('версия кэша лент', lambda: bump_version('posts')))
+    return steps
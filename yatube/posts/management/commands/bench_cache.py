@@ -0,0 +1,85 @@
+import multiprocessing
+import tempfile
+import time
+
+from django.core.cache.backends.filebased import FileBasedCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.management.base import BaseCommand
+
+from yatube.cache_backends import SQLiteCache
+
+
+def make_backends(directory):
+    return {
+        'locmem': (LocMemCache, 'bench', {
+            'OPTIONS': {'MAX_ENTRIES': 10 ** 6}
+        }),
+        'filebased': (FileBasedCache, f'{directory}/files', {
+            'OPTIONS': {'MAX_ENTRIES': 10 ** 6}
+        }),
+        'sqlite': (SQLiteCache, f'{directory}/cache.sqlite3', {}),
+    }
+
+
+def incr_worker(backend, location, params, key, count):
+    cache = backend(location, params)
+    for _ in range(count):
+        cache.incr(key)
+
+
+class Command(BaseCommand):
+    help = 'Сравнивает бэкенды кэша: locmem, filebased и общий SQLite'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--keys', type=int, default=2000)
+        parser.add_argument('--value-size', type=int, default=2048)
+        parser.add_argument('--processes', type=int, default=4)
+        parser.add_argument('--incr-per-process', type=int, default=200)
+
+    def timed(self, operation, count):
+        started = time.perf_counter()
+        operation()
+        return (time.perf_counter() - started) / count * 10 ** 6
+
+    def handle(self, *args, **options):
+        keys = [f'bench:{i}' for i in range(options['keys'])]
+        value = 'x' * options['value_size']
+        processes = options['processes']
+        per_process = options['incr_per_process']
+        self.stdout.write(
+            f'{"backend":<10} {"set, мкс":>10} {"get, мкс":>10} '
+            f'{"incr, мкс":>10} {"incr из процессов":>20}'
+        )
+        with tempfile.TemporaryDirectory() as directory:
+            for name, (backend, location, params) in make_backends(
+                    directory).items():
+                cache = backend(location, params)
+                cache.set('counter', 0, None)
+                set_time = self.timed(
+                    lambda: [cache.set(key, value) for key in keys],
+                    len(keys)
+                )
+                get_time = self.timed(
+                    lambda: [cache.get(key) for key in keys], len(keys)
+                )
+                incr_time = self.timed(
+                    lambda: [cache.incr('counter') for _ in keys], len(keys)
+                )
+                cache.set('shared', 0, None)
+                workers = [
+                    multiprocessing.Process(
+                        target=incr_worker,
+                        args=(backend, location, params, 'shared',
+                              per_process)
+                    )
+                    for _ in range(processes)
+                ]
+                for worker in workers:
+                    worker.start()
+                for worker in workers:
+                    worker.join()
+                shared = f'{cache.get("shared")}/{processes * per_process}'
+                self.stdout.write(
+                    f'{name:<10} {set_time:>10.1f} {get_time:>10.1f} '
+                    f'{incr_time:>10.1f} {shared:>20}'
+                )
@@ -0,0 +1,96 @@
+import datetime as dt
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.template import Engine, RequestContext
+from django.test import RequestFactory
+
+from posts.models import Group, Post, User
+
+# Вариант: (шаблон, оставлять ли кэш карточек прогретым между рендерами).
+VARIANTS = {
+    'include': (
+        '{% for post in page %}'
+        '{% include "includes/post_item.html" %}'
+        '{% endfor %}',
+        False
+    ),
+    'post_list': ('{% load post_tags %}{% post_list page %}', False),
+    'из кэша': ('{% load post_tags %}{% post_list page %}', True),
+}
+BASE_LOADERS = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
+# Загрузчик из настроек проекта не используется: сравниваются оба.
+LOADERS = {
+    'обычный': BASE_LOADERS,
+    'кэширующий': [('django.template.loaders.cached.Loader', BASE_LOADERS)],
+}
+
+
+def make_posts(count):
+    """Несохранённые посты со всем, что нужно карточке, без запросов к БД.
+    """
+    group = Group(pk=1, title='Группа', slug='group')
+    moment = dt.datetime(2021, 1, 1, tzinfo=dt.timezone.utc)
+    posts = []
+    for i in range(count):
+        author = User(pk=i + 1, username=f'author_{i}')
+        post = Post(
+            pk=i + 1, text='Текст поста ' * 20, author=author, group=group,
+            pub_date=moment, updated=moment
+        )
+        post.comment_count = i
+        posts.append(post)
+    return posts
+
+
+def make_engine(loaders):
+    options = settings.TEMPLATES[0]['OPTIONS']
+    return Engine(
+        dirs=settings.TEMPLATES[0]['DIRS'],
+        loaders=loaders,
+        context_processors=options['context_processors'],
+        libraries={'post_tags': 'posts.templatetags.post_tags'},
+    )
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает рендер страницы карточек: include на каждый пост '
+        'против тега post_list, с обычным и кэширующим загрузчиком; '
+        'отдельно — post_list с прогретым кэшем карточек'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=10)
+        parser.add_argument('--iterations', type=int, default=500)
+
+    def handle(self, *args, **options):
+        request = RequestFactory().get('/')
+        request.user = AnonymousUser()
+        posts = make_posts(options['posts'])
+        iterations = options['iterations']
+        self.stdout.write(
+            f'{"загрузчик":<12} {"вариант":<10} {"мс на страницу":>15}'
+        )
+        for loader_name, loaders in LOADERS.items():
+            engine = make_engine(loaders)
+            for name, (source, warm) in VARIANTS.items():
+                template = engine.from_string(source)
+                template.render(RequestContext(request, {'page': posts}))
+                elapsed = 0
+                for _ in range(iterations):
+                    if not warm:
+                        cache.clear()
+                    started = time.perf_counter()
+                    template.render(RequestContext(request, {'page': posts}))
+                    elapsed += time.perf_counter() - started
+                elapsed /= iterations
+                self.stdout.write(
+                    f'{loader_name:<12} {name:<10} {elapsed * 1000:>15.3f}'
+                )
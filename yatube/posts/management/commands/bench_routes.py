@@ -0,0 +1,83 @@
+import json
+import logging
+
+from django.core.management.base import BaseCommand, CommandError
+
+from posts import benchmark
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет все маршруты posts, users, about и api на синтетических '
+        'данных во временной базе и сравнивает с базовым прогоном'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=200)
+        parser.add_argument('--groups', type=int, default=10)
+        parser.add_argument('--posts', type=int, default=2000)
+        parser.add_argument('--comments', type=int, default=5000)
+        parser.add_argument('--follows', type=int, default=2000)
+        parser.add_argument('--iterations', type=int, default=20)
+        parser.add_argument('--warmup', type=int, default=2)
+        parser.add_argument(
+            '--output', help='Файл для результатов в формате JSON'
+        )
+        parser.add_argument(
+            '--baseline', help='JSON предыдущего прогона для сравнения'
+        )
+        parser.add_argument(
+            '--tolerance',
+            type=float,
+            default=0.2,
+            help='Допустимый рост p95 и размера ответа (доля)'
+        )
+
+    def handle(self, *args, **options):
+        baseline = None
+        if options['baseline']:
+            with open(options['baseline'], encoding='utf-8') as source:
+                baseline = json.load(source)['routes']
+        dataset = {
+            name: options[name]
+            for name in ('users', 'groups', 'posts', 'comments', 'follows')
+        }
+        with benchmark.temporary_database(**dataset) as loaded:
+            # Страницы 404 и 500 входят в обход: их записи в журнал
+            # на каждой итерации только мешают читать отчёт.
+            logging.disable(logging.ERROR)
+            try:
+                results = benchmark.run(
+                    options['iterations'], options['warmup']
+                )
+            finally:
+                logging.disable(logging.NOTSET)
+        self.report(results)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as output:
+                json.dump(
+                    {'dataset': loaded, 'routes': results}, output,
+                    ensure_ascii=False, indent=2, sort_keys=True
+                )
+        if baseline is not None:
+            regressions = benchmark.compare(
+                results, baseline, options['tolerance']
+            )
+            if regressions:
+                raise CommandError(
+                    'Регрессии относительно базового прогона:\n'
+                    + '\n'.join(regressions)
+                )
+            self.stdout.write('Регрессий нет')
+
+    def report(self, results):
+        self.stdout.write(
+            f'{"маршрут":<26} {"код":>4} {"p50, мс":>9} {"p95, мс":>9} '
+            f'{"SQL":>5} {"байт":>9}'
+        )
+        for name, row in results.items():
+            self.stdout.write(
+                f'{name:<26} {row["status"]:>4} {row["p50_ms"]:>9.2f} '
+                f'{row["p95_ms"]:>9.2f} {row["queries"]:>5} '
+                f'{row["bytes"]:>9}'
+            )
@@ -0,0 +1,146 @@
+import multiprocessing
+import os
+import random
+import sqlite3
+import tempfile
+import time
+
+from django.core.management.base import BaseCommand
+
+from yatube.sqlite.base import PROFILES, apply_profile
+
+SCHEMA = """
+CREATE TABLE post (
+    id INTEGER PRIMARY KEY,
+    author_id INTEGER NOT NULL,
+    text TEXT NOT NULL,
+    pub_date REAL NOT NULL
+);
+CREATE INDEX post_author_pub_date ON post (author_id, pub_date DESC);
+CREATE TABLE comment (
+    id INTEGER PRIMARY KEY,
+    post_id INTEGER NOT NULL,
+    text TEXT NOT NULL,
+    created REAL NOT NULL
+);
+CREATE INDEX comment_post_created ON comment (post_id, created DESC);
+"""
+AUTHORS = 200
+
+
+def connect(path, profile):
+    # timeout=5 — как у стандартного бэкенда Django.
+    connection = sqlite3.connect(path, timeout=5, isolation_level=None)
+    apply_profile(connection, PROFILES[profile])
+    return connection
+
+
+def prepare(path, profile, posts):
+    connection = connect(path, profile)
+    connection.executescript(SCHEMA)
+    connection.execute('BEGIN')
+    connection.executemany(
+        'INSERT INTO post (author_id, text, pub_date) VALUES (?, ?, ?)',
+        ((i % AUTHORS, 'x' * 200, time.time() - i) for i in range(posts))
+    )
+    connection.execute('COMMIT')
+    connection.close()
+
+
+def reader(path, profile, deadline, posts):
+    connection = connect(path, profile)
+    done = errors = 0
+    while time.time() < deadline:
+        try:
+            connection.execute(
+                'SELECT id, text FROM post WHERE author_id = ? '
+                'ORDER BY pub_date DESC LIMIT 10',
+                (random.randrange(AUTHORS),)
+            ).fetchall()
+            connection.execute(
+                'SELECT id, text FROM comment WHERE post_id = ? '
+                'ORDER BY created DESC LIMIT 20',
+                (random.randint(1, posts),)
+            ).fetchall()
+            done += 1
+        except sqlite3.OperationalError:
+            errors += 1
+    return 'read', done, errors
+
+
+def writer(path, profile, deadline, posts):
+    """Транзакция, как у add_comment: проверка поста, затем вставка."""
+    connection = connect(path, profile)
+    begin = 'BEGIN IMMEDIATE' if PROFILES[profile].get('immediate') else (
+        'BEGIN'
+    )
+    done = errors = 0
+    while time.time() < deadline:
+        post_id = random.randint(1, posts)
+        try:
+            connection.execute(begin)
+            connection.execute(
+                'SELECT id FROM post WHERE id = ?', (post_id,)
+            ).fetchone()
+            connection.execute(
+                'INSERT INTO comment (post_id, text, created) '
+                'VALUES (?, ?, ?)',
+                (post_id, 'comment', time.time())
+            )
+            connection.execute('COMMIT')
+            done += 1
+        except sqlite3.OperationalError:
+            if connection.in_transaction:
+                connection.execute('ROLLBACK')
+            errors += 1
+    return 'write', done, errors
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает профили SQLite под нагрузкой: процессы-читатели '
+        'против процессов-писателей'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--profiles', nargs='+', default=list(PROFILES),
+            choices=list(PROFILES)
+        )
+        parser.add_argument('--readers', type=int, default=4)
+        parser.add_argument('--writers', type=int, default=4)
+        parser.add_argument('--seconds', type=float, default=5)
+        parser.add_argument('--posts', type=int, default=10000)
+
+    def handle(self, *args, **options):
+        seconds = options['seconds']
+        self.stdout.write(
+            f'{"профиль":<12} {"чтений/с":>10} {"записей/с":>10} '
+            f'{"ошибок чтения":>14} {"ошибок записи":>14}'
+        )
+        for profile in options['profiles']:
+            with tempfile.TemporaryDirectory() as directory:
+                path = os.path.join(directory, 'bench.sqlite3')
+                prepare(path, profile, options['posts'])
+                deadline = time.time() + 1 + seconds
+                jobs = (
+                    [(reader, path, profile, deadline, options['posts'])]
+                    * options['readers']
+                    + [(writer, path, profile, deadline, options['posts'])]
+                    * options['writers']
+                )
+                with multiprocessing.Pool(len(jobs)) as pool:
+                    results = [
+                        pool.apply_async(job, arguments)
+                        for job, *arguments in jobs
+                    ]
+                    results = [result.get() for result in results]
+            totals = {'read': [0, 0], 'write': [0, 0]}
+            for kind, done, errors in results:
+                totals[kind][0] += done
+                totals[kind][1] += errors
+            self.stdout.write(
+                f'{profile:<12} {totals["read"][0] / seconds:>10.0f} '
+                f'{totals["write"][0] / seconds:>10.0f} '
+                f'{totals["read"][1]:>14} {totals["write"][1]:>14}'
+            )
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from posts import trending
+
+
+class Command(BaseCommand):
+    help = (
+        'Удаляет затухшие строки трендов; с --rebuild пересобирает тренды '
+        'по постам и комментариям за последнее окно'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rebuild',
+            action='store_true',
+            help='Пересобрать тренды по данным, а не только почистить'
+        )
+
+    def handle(self, *args, **options):
+        if options['rebuild']:
+            total = trending.rebuild()
+            self.stdout.write(f'Строк трендов после пересборки: {total}')
+        removed = trending.compact()
+        self.stdout.write(f'Удалено затухших строк: {removed}')
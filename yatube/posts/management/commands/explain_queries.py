@@ -0,0 +1,47 @@
+import logging
+
+from django.core.management.base import BaseCommand
+
+from posts import advisor, benchmark
+
+
+class Command(BaseCommand):
+    help = (
+        'Разбирает EXPLAIN QUERY PLAN запросов каждой страницы posts '
+        'на синтетических данных и отмечает полные обходы и сортировки '
+        'во временных B-деревьях'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=200)
+        parser.add_argument('--posts', type=int, default=2000)
+        parser.add_argument('--comments', type=int, default=5000)
+        parser.add_argument('--follows', type=int, default=2000)
+        parser.add_argument(
+            '--verbose-plans',
+            action='store_true',
+            help='Печатать планы и запросы без замечаний'
+        )
+
+    def handle(self, *args, **options):
+        dataset = {
+            name: options[name]
+            for name in ('users', 'posts', 'comments', 'follows')
+        }
+        with benchmark.temporary_database(**dataset):
+            logging.disable(logging.ERROR)
+            try:
+                report = advisor.analyze()
+            finally:
+                logging.disable(logging.NOTSET)
+        flagged = 0
+        for name, queries in report.items():
+            for sql, plan, problems in queries:
+                if not problems and not options['verbose_plans']:
+                    continue
+                flagged += bool(problems)
+                self.stdout.write(f'{name}: {"; ".join(problems) or "ок"}')
+                self.stdout.write(f'    {sql}')
+                for line in plan:
+                    self.stdout.write(f'    -> {line}')
+        self.stdout.write(f'Запросов с замечаниями: {flagged}')
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.export import EXPORTS, FORMATS, lines, parse_moment
+
+
+class Command(BaseCommand):
+    help = 'Потоковая выгрузка постов, комментариев, подписок и групп'
+
+    def add_arguments(self, parser):
+        parser.add_argument('model', choices=sorted(EXPORTS))
+        parser.add_argument('--format', choices=FORMATS, default='jsonl')
+        parser.add_argument('--since', help='Начало периода, ISO 8601')
+        parser.add_argument('--until', help='Конец периода, ISO 8601')
+        parser.add_argument('--author', help='Имя пользователя автора')
+        parser.add_argument('--output', help='Файл; по умолчанию stdout')
+
+    def handle(self, *args, **options):
+        try:
+            export = lines(
+                options['model'],
+                options['format'],
+                since=parse_moment(options['since']),
+                until=parse_moment(options['until']),
+                author=options['author']
+            )
+        except ValueError as error:
+            raise CommandError(error)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8',
+                      newline='') as output:
+                output.writelines(export)
+            return
+        for line in export:
+            self.stdout.write(line, ending='')
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from posts.importer import generate_all_thumbnails
+
+
+class Command(BaseCommand):
+    help = 'Строит миниатюры для всех картинок постов'
+
+    def handle(self, *args, **options):
+        total = generate_all_thumbnails()
+        self.stdout.write(f'Обработано картинок: {total}')
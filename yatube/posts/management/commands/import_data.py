@@ -0,0 +1,46 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from posts.importer import ORDER, Importer, rebuild_steps
+
+
+class Command(BaseCommand):
+    help = (
+        'Массовая загрузка пользователей, групп, постов, комментариев '
+        'и подписок из JSONL (формат export_data)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('files', nargs='+', help='Файлы JSONL')
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument(
+            '--skip-thumbnails',
+            action='store_true',
+            help='Не строить миниатюры в финальном проходе'
+        )
+
+    def handle(self, *args, **options):
+        importer = Importer(batch_size=options['batch_size'])
+        started = time.perf_counter()
+        for path in options['files']:
+            with open(path, encoding='utf-8') as lines:
+                importer.load(lines)
+        elapsed = time.perf_counter() - started
+        total = sum(importer.loaded.values())
+        for name in ORDER:
+            self.stdout.write(
+                f'{name}: загружено {importer.loaded[name]}, '
+                f'пропущено {importer.skipped[name]}'
+            )
+        self.stdout.write(
+            f'Всего {total} строк за {elapsed:.1f} с '
+            f'({total / max(elapsed, 1e-9):.0f} строк/с)'
+        )
+        for title, step in rebuild_steps(not options['skip_thumbnails']):
+            started = time.perf_counter()
+            step()
+            self.stdout.write(
+                f'Пересобрано: {title} за '
+                f'{time.perf_counter() - started:.1f} с'
+            )
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from posts.recommendations import rebuild
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает рекомендации «на кого подписаться» по графу подписок'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=1000,
+            help='Скольким пользователям считать рекомендации за один проход'
+        )
+        parser.add_argument(
+            '--top',
+            type=int,
+            default=None,
+            help='Сколько авторов сохранять каждому пользователю'
+        )
+
+    def handle(self, *args, **options):
+        total = rebuild(options['chunk_size'], options['top'])
+        self.stdout.write(
+            f'Рекомендации пересчитаны для {total} пользователей'
+        )
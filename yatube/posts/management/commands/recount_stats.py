@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from posts.stats import recount_all
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает счётчики записей и подписок пользователей'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=1000,
+            help='Сколько пользователей пересчитывать за один проход'
+        )
+
+    def handle(self, *args, **options):
+        total = recount_all(options['chunk_size'])
+        self.stdout.write(f'Пересчитано пользователей: {total}')
@@ -0,0 +1,30 @@
+import sqlite3
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+
+class Command(BaseCommand):
+    help = (
+        'Копирует основную базу SQLite в файлы реплик из REPLICA_DATABASES '
+        '(замена репликации для локальной проверки маршрутизации)'
+    )
+
+    def handle(self, *args, **options):
+        databases = settings.DATABASES
+        if connection.vendor != 'sqlite':
+            raise CommandError('Команда работает только с SQLite')
+        if not settings.REPLICA_DATABASES:
+            raise CommandError('Реплики не настроены: задайте YATUBE_REPLICAS')
+        source = sqlite3.connect(databases['default']['NAME'])
+        try:
+            for alias in settings.REPLICA_DATABASES:
+                target = sqlite3.connect(databases[alias]['NAME'])
+                try:
+                    source.backup(target)
+                finally:
+                    target.close()
+                self.stdout.write(f'{alias}: {databases[alias]["NAME"]}')
+        finally:
+            source.close()
@@ -0,0 +1,130 @@
+import re
+
+from django.db import migrations
+
+# Стеммер и SQL скопированы из posts.search на момент миграции, чтобы
+# её результат не менялся вместе с кодом приложения.
+TABLES = ('posts_post_fts', 'posts_comment_fts')
+
+WORD = re.compile(r'\w+')
+VOWELS = 'аеиоуыэюя'
+PERFECTIVE_GERUND = re.compile(
+    r'(ив|ивши|ившись|ыв|ывши|ывшись|(?<=[ая])(в|вши|вшись))$'
+)
+REFLEXIVE = re.compile(r'(ся|сь)$')
+ADJECTIVE = re.compile(
+    r'(ее|ие|ые|ое|ими|ыми|ей|ий|ый|ой|ем|им|ым|ом|его|ого|ему|ому|их|ых'
+    r'|ую|юю|ая|яя|ою|ею)$'
+)
+PARTICIPLE = re.compile(r'(ивш|ывш|ующ|(?<=[ая])(ем|нн|вш|ющ|щ))$')
+VERB = re.compile(
+    r'(ила|ыла|ена|ейте|уйте|ите|или|ыли|ей|уй|ил|ыл|им|ым|ен|ило|ыло|ено'
+    r'|ят|ует|уют|ит|ыт|ены|ить|ыть|ишь|ую|ю'
+    r'|(?<=[ая])(ла|на|ете|йте|ли|й|л|ем|н|ло|но|ет|ют|ны|ть|ешь|нно))$'
+)
+NOUN = re.compile(
+    r'(а|ев|ов|ие|ье|е|иями|ями|ами|еи|ии|и|ией|ей|ой|ий|й|иям|ям|ием|ем'
+    r'|ам|ом|о|у|ах|иях|ях|ы|ь|ию|ью|ю|ия|ья|я)$'
+)
+DERIVATIONAL = re.compile(r'(ост|ость)$')
+SUPERLATIVE = re.compile(r'(ейш|ейше)$')
+
+
+def _region(word, start=0):
+    """Начало области после первого сочетания «гласная + согласная»."""
+    for index in range(start + 1, len(word)):
+        if word[index] not in VOWELS and word[index - 1] in VOWELS:
+            return index + 1
+    return len(word)
+
+
+def _strip_inflection(rv):
+    if PERFECTIVE_GERUND.search(rv):
+        return PERFECTIVE_GERUND.sub('', rv)
+    rv = REFLEXIVE.sub('', rv)
+    if ADJECTIVE.search(rv):
+        return PARTICIPLE.sub('', ADJECTIVE.sub('', rv))
+    if VERB.search(rv):
+        return VERB.sub('', rv)
+    return NOUN.sub('', rv)
+
+
+def stem(word):
+    """Стеммер Портера (Snowball) для русского языка."""
+    word = word.lower().replace('ё', 'е')
+    for index, letter in enumerate(word):
+        if letter in VOWELS:
+            rv_start = index + 1
+            break
+    else:
+        return word
+    r2_start = _region(word, _region(word))
+    prefix, rv = word[:rv_start], _strip_inflection(word[rv_start:])
+    if rv.endswith('и'):
+        rv = rv[:-1]
+    match = DERIVATIONAL.search(rv)
+    if match and rv_start + match.start() >= r2_start:
+        rv = rv[:match.start()]
+    if rv.endswith('нн'):
+        rv = rv[:-1]
+    elif SUPERLATIVE.search(rv):
+        rv = SUPERLATIVE.sub('', rv)
+        if rv.endswith('нн'):
+            rv = rv[:-1]
+    elif rv.endswith('ь'):
+        rv = rv[:-1]
+    return prefix + rv
+
+
+def normalize(text):
+    """Текст документа в виде основ слов, разделённых пробелами."""
+    return ' '.join(stem(word) for word in WORD.findall(text))
+
+
+def fill(schema_editor, table, queryset, batch_size=1000):
+    with schema_editor.connection.cursor() as cursor:
+        batch = []
+        for pk, text in queryset.values_list('pk', 'text').iterator():
+            batch.append((pk, normalize(text)))
+            if len(batch) >= batch_size:
+                cursor.executemany(
+                    f'INSERT INTO {table} (rowid, body) VALUES (%s, %s)',
+                    batch
+                )
+                batch = []
+        if batch:
+            cursor.executemany(
+                f'INSERT INTO {table} (rowid, body) VALUES (%s, %s)', batch
+            )
+
+
+def create_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for table in TABLES:
+        schema_editor.execute(
+            f'CREATE VIRTUAL TABLE IF NOT EXISTS {table} USING fts5('
+            "body, tokenize = 'unicode61 remove_diacritics 2')"
+        )
+    fill(schema_editor, 'posts_post_fts',
+         apps.get_model('posts', 'Post').objects.all())
+    fill(schema_editor, 'posts_comment_fts',
+         apps.get_model('posts', 'Comment').objects.all())
+
+
+def drop_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for table in TABLES:
+        schema_editor.execute(f'DROP TABLE IF EXISTS {table}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0011_userstats'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
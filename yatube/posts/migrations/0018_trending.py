@@ -0,0 +1,38 @@
+# Generated by Django 2.2.6 on 2026-10-18 02:13
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0017_recommendation'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TrendingGroup',
+            fields=[
+                ('score', models.FloatField(default=0, verbose_name='Счёт')),
+                ('updated', models.DateTimeField(verbose_name='Счёт на момент')),
+                ('rank', models.FloatField(db_index=True, verbose_name='Ранг')),
+                ('group', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='trending', serialize=False, to='posts.Group', verbose_name='Сообщество')),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='TrendingPost',
+            fields=[
+                ('score', models.FloatField(default=0, verbose_name='Счёт')),
+                ('updated', models.DateTimeField(verbose_name='Счёт на момент')),
+                ('rank', models.FloatField(db_index=True, verbose_name='Ранг')),
+                ('post', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='trending', serialize=False, to='posts.Post', verbose_name='Пост')),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+    ]
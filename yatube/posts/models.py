@@ -46,9 +46,36 @@ class Post(models.Model):
         null=True,
         verbose_name='Картинка'
     )
+    # Имя готовой миниатюры карточки в хранилище; пишется фоновой задачей
+    # posts.thumbnails, пока пусто — в ленте заглушка.
+    thumbnail = models.CharField(
+        max_length=255,
+        blank=True,
+        editable=False,
+        verbose_name='Миниатюра'
+    )
+    updated = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Дата изменения'
+    )
+    # Пишется пачками из posts.counters, мимо auto_now поля updated.
+    views = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Просмотров'
+    )
 
     class Meta:
         ordering = ('-pub_date',)
+        indexes = [
+            models.Index(
+                fields=['author', '-pub_date'],
+                name='post_author_pub_date_idx'
+            ),
+            models.Index(
+                fields=['group', '-pub_date'],
+                name='post_group_pub_date_idx'
+            ),
+        ]
 
     def __str__(self):
         return self.text[:15]
@@ -75,6 +102,12 @@ class Comment(models.Model):
 
     class Meta:
         ordering = ['-created']
+        indexes = [
+            models.Index(
+                fields=['post', '-created', '-id'],
+                name='comment_post_created_id_idx'
+            ),
+        ]
 
     def __str__(self):
         return self.text[:15]
@@ -95,6 +128,154 @@ class Follow(models.Model):
     )
 
     class Meta:
+        indexes = [
+            models.Index(
+                fields=['author', 'user'],
+                name='follow_author_user_idx'
+            ),
+            # Списки подписчиков и подписок листаются от новых к старым.
+            models.Index(
+                fields=['author', '-id'],
+                name='follow_author_id_idx'
+            ),
+            models.Index(
+                fields=['user', '-id'],
+                name='follow_user_id_idx'
+            ),
+        ]
         constraints = [models.UniqueConstraint(
             fields=['user', 'author'], name='unique_members')
         ]
+
+
+class TimelineEntry(models.Model):
+    """Материализованная лента подписок: строка на пару (читатель, пост).
+
+    Заполняется при публикации поста (fan-out on write), чтобы чтение
+    страницы `follow/` было диапазонным сканом индекса одной таблицы.
+    """
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='timeline',
+        verbose_name='Читатель'
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name='Автор'
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='timeline_entries',
+        verbose_name='Пост'
+    )
+    pub_date = models.DateTimeField(verbose_name='Дата публикации поста')
+
+    class Meta:
+        # post_id, а не post: иначе Django подставит сортировку Post.
+        ordering = ('-pub_date', '-post_id')
+        indexes = [
+            models.Index(
+                fields=['user', '-pub_date', '-post'],
+                name='timeline_user_feed_idx'
+            ),
+            models.Index(
+                fields=['user', 'author'],
+                name='timeline_user_author_idx'
+            ),
+        ]
+        constraints = [models.UniqueConstraint(
+            fields=['user', 'post'], name='unique_timeline_entry')
+        ]
+
+
+class UserStats(models.Model):
+    """Денормализованные счётчики пользователя для карточки автора."""
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats',
+        verbose_name='Пользователь'
+    )
+    posts_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Записей'
+    )
+    followers_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Подписчиков'
+    )
+    following_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Подписок'
+    )
+
+    def __str__(self):
+        return str(self.user_id)
+
+
+class Recommendation(models.Model):
+    """Автор, на которого стоит подписаться; таблицу пересчитывает
+    команда ``recommend_authors``."""
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='recommendations',
+        verbose_name='Пользователь'
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name='Автор'
+    )
+    score = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Общих подписок'
+    )
+    rank = models.PositiveSmallIntegerField(verbose_name='Место')
+
+    class Meta:
+        ordering = ('rank',)
+        constraints = [models.UniqueConstraint(
+            fields=['user', 'rank'], name='unique_recommendation_rank')
+        ]
+
+
+class TrendingScore(models.Model):
+    """Затухающая активность: счёт ``score`` на момент ``updated``.
+
+    ``rank`` = log2(score) + updated / период полураспада. Порядок по нему
+    совпадает с порядком по счёту, затухшему к любому моменту, поэтому
+    тренды выбираются по индексу без пересчёта строк.
+    """
+    score = models.FloatField(default=0, verbose_name='Счёт')
+    updated = models.DateTimeField(verbose_name='Счёт на момент')
+    rank = models.FloatField(db_index=True, verbose_name='Ранг')
+
+    class Meta:
+        abstract = True
+
+
+class TrendingPost(TrendingScore):
+    post = models.OneToOneField(
+        Post,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='trending',
+        verbose_name='Пост'
+    )
+
+
+class TrendingGroup(TrendingScore):
+    group = models.OneToOneField(
+        Group,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='trending',
+        verbose_name='Сообщество'
+    )
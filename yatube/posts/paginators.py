@@ -0,0 +1,161 @@
+from collections.abc import Sequence
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
+from django.core import signing
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+from django.db.models import Q
+
+CURSOR_SALT = 'posts.cursor'
+NEXT = 'n'
+PREVIOUS = 'p'
+
+
+class CursorPage(Sequence):
+    """Страница курсорной пагинации.
+
+    Повторяет интерфейс ``django.core.paginator.Page`` в той части,
+    которую используют шаблоны, но вместо номеров страниц отдаёт
+    непрозрачные токены ``next_cursor`` и ``previous_cursor``.
+    """
+    is_cursor = True
+
+    def __init__(self, object_list, paginator, next_cursor=None,
+                 previous_cursor=None):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __repr__(self):
+        return '<Cursor page of %s items>' % len(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class CursorPaginator:
+    """Keyset-пагинация по набору полей ``ordering``.
+
+    Каждая страница выбирается условием ``WHERE (pub_date, id) < (...)``
+    и ``LIMIT per_page + 1``, поэтому её стоимость не зависит от того,
+    насколько глубоко пролистана лента: нет ни ``COUNT(*)``,
+    ни ``OFFSET``. Последнее поле ``ordering`` должно быть уникальным.
+    """
+
+    def __init__(self, object_list, per_page, ordering=('-pub_date', '-id')):
+        self.object_list = object_list
+        self.per_page = int(per_page)
+        self.ordering = tuple(ordering)
+        self.fields = [name.lstrip('-') for name in self.ordering]
+
+    def encode_cursor(self, obj, direction):
+        values = [getattr(obj, name) for name in self.fields]
+        values = [
+            value.isoformat() if hasattr(value, 'isoformat') else value
+            for value in values
+        ]
+        return signing.dumps([direction, values], salt=CURSOR_SALT)
+
+    def decode_cursor(self, cursor):
+        try:
+            direction, values = signing.loads(cursor, salt=CURSOR_SALT)
+        except (signing.BadSignature, TypeError, ValueError):
+            return None, None
+        if direction not in (NEXT, PREVIOUS) or len(values) != len(
+                self.fields):
+            return None, None
+        model = self.object_list.model
+        try:
+            values = [
+                model._meta.get_field(name).to_python(value)
+                for name, value in zip(self.fields, values)
+            ]
+        except (ValidationError, TypeError, ValueError):
+            return None, None
+        return direction, values
+
+    def _seek(self, values, backwards):
+        """Строит условие «строго после ``values``» в порядке сортировки."""
+        conditions = []
+        for index, name in enumerate(self.ordering):
+            field = name.lstrip('-')
+            descending = name.startswith('-') != backwards
+            lookup = {
+                prefix: value for prefix, value
+                in zip(self.fields[:index], values[:index])
+            }
+            lookup['%s__%s' % (field, 'lt' if descending else 'gt')] = (
+                values[index]
+            )
+            conditions.append(Q(**lookup))
+        return reduce(or_, conditions)
+
+    def _reversed_ordering(self):
+        return [
+            name[1:] if name.startswith('-') else '-' + name
+            for name in self.ordering
+        ]
+
+    def get_page(self, cursor=None):
+        direction, values = self.decode_cursor(cursor) if cursor else (
+            None, None
+        )
+        backwards = direction == PREVIOUS
+        queryset = self.object_list
+        if values is not None:
+            queryset = queryset.filter(self._seek(values, backwards))
+        if backwards:
+            queryset = queryset.order_by(*self._reversed_ordering())
+        else:
+            queryset = queryset.order_by(*self.ordering)
+        rows = list(queryset[:self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if backwards:
+            rows.reverse()
+            has_next, has_previous = True, has_more
+        else:
+            has_next, has_previous = has_more, values is not None
+        return CursorPage(
+            rows,
+            self,
+            next_cursor=(
+                self.encode_cursor(rows[-1], NEXT)
+                if rows and has_next else None
+            ),
+            previous_cursor=(
+                self.encode_cursor(rows[0], PREVIOUS)
+                if rows and has_previous else None
+            ),
+        )
+
+
+def paginate(request, object_list, ordering=('-pub_date', '-id')):
+    """Возвращает страницу ленты для запроса.
+
+    Параметр ``?cursor=`` всегда включает курсорный режим; без него режим
+    определяется настройкой ``POSTS_PAGINATION``.
+    """
+    cursor = request.GET.get('cursor')
+    if cursor is not None or settings.POSTS_PAGINATION == 'cursor':
+        paginator = CursorPaginator(
+            object_list, settings.POSTS_PAGINATOR, ordering
+        )
+        return paginator.get_page(cursor)
+    paginator = Paginator(object_list, settings.POSTS_PAGINATOR)
+    return paginator.get_page(request.GET.get('page'))
@@ -0,0 +1,153 @@
+from array import array
+from collections import Counter, defaultdict
+from heapq import nsmallest
+
+from django.conf import settings
+from django.db import transaction
+
+from . import follows
+from .cache import bump_version
+from .models import Follow, Recommendation, User
+
+
+class FollowGraph:
+    """Граф подписок в разреженном виде, как строки CSR-матрицы.
+
+    ``authors`` — id авторов всех подписок подряд, упорядоченные по
+    подписчику; ``rows[user_id]`` — срез этого массива с подписками
+    пользователя. В памяти лежат два целых на подписку, а не объекты.
+    """
+
+    def __init__(self):
+        self.authors = array('q')
+        self.rows = {}
+        self.followers = Counter()
+        pairs = Follow.objects.order_by('user_id', 'author_id').values_list(
+            'user_id', 'author_id'
+        )
+        current, start = None, 0
+        for user_id, author_id in pairs.iterator():
+            if user_id != current:
+                if current is not None:
+                    self.rows[current] = (start, len(self.authors))
+                current, start = user_id, len(self.authors)
+            self.authors.append(author_id)
+            self.followers[author_id] += 1
+        if current is not None:
+            self.rows[current] = (start, len(self.authors))
+
+    def followees(self, user_id):
+        start, end = self.rows.get(user_id, (0, 0))
+        return self.authors[start:end]
+
+    def popular(self, count):
+        """Самые читаемые авторы — запас для тех, у кого мало кандидатов."""
+        return [
+            (author_id, 0)
+            for author_id, _ in self.followers.most_common(count)
+        ]
+
+    def suggest(self, user_ids, top_k, popular):
+        """Лучшие ``top_k`` авторов для каждого пользователя пачки.
+
+        Очки кандидата — сколько авторов из подписок пользователя сами
+        на него подписаны (строка A·A). При равенстве выше тот, у кого
+        больше подписчиков.
+
+        Подписки пачки сначала обращаются: для каждого автора — кто из
+        пачки на него подписан. Строка графа автора читается один раз на
+        пачку, а не один раз на каждого его подписчика. Работа всё равно
+        растёт как сумма по авторам (число подписок автора × его
+        подписчики в пачке). Пачку стоит держать такой, чтобы счётчики
+        кандидатов всех её пользователей помещались в память.
+        """
+        readers = defaultdict(list)
+        for user_id in user_ids:
+            for followee in self.followees(user_id):
+                readers[followee].append(user_id)
+        scores = {user_id: Counter() for user_id in user_ids}
+        for followee, chunk_readers in readers.items():
+            candidates = self.followees(followee)
+            for user_id in chunk_readers:
+                scores[user_id].update(candidates)
+        return {
+            user_id: self.rank(user_id, scores[user_id], top_k, popular)
+            for user_id in user_ids
+        }
+
+    def rank(self, user_id, scores, top_k, popular):
+        skip = set(self.followees(user_id))
+        skip.add(user_id)
+        ranked = nsmallest(
+            top_k,
+            (item for item in scores.items() if item[0] not in skip),
+            key=lambda item: (-item[1], -self.followers[item[0]], item[0])
+        )
+        taken = skip.union(author_id for author_id, _ in ranked)
+        for author_id, score in popular:
+            if len(ranked) >= top_k:
+                break
+            if author_id not in taken:
+                ranked.append((author_id, score))
+        return ranked
+
+
+def store(suggestions):
+    """Заменяет рекомендации пользователей пачки одной транзакцией."""
+    with transaction.atomic():
+        Recommendation.objects.filter(user__in=list(suggestions)).delete()
+        Recommendation.objects.bulk_create(
+            Recommendation(
+                user_id=user_id, author_id=author_id, score=score, rank=rank
+            )
+            for user_id, ranked in suggestions.items()
+            for rank, (author_id, score) in enumerate(ranked)
+        )
+
+
+def rebuild(chunk_size=1000, top_k=None):
+    """Пересчитывает рекомендации всех пользователей пачками по ``pk``.
+
+    Граф подписок читается один раз; каждая пачка считается в памяти
+    и записывается своей транзакцией.
+    """
+    top_k = top_k or settings.RECOMMENDATIONS_TOP_K
+    graph = FollowGraph()
+    # Запас берётся с учётом того, что часть популярных уже в подписках.
+    popular = graph.popular(top_k * 2)
+    last_pk = 0
+    total = 0
+    while True:
+        user_ids = list(
+            User.objects.filter(pk__gt=last_pk).order_by('pk')
+            .values_list('pk', flat=True)[:chunk_size]
+        )
+        if not user_ids:
+            break
+        store(graph.suggest(user_ids, top_k, popular))
+        total += len(user_ids)
+        last_pk = user_ids[-1]
+    bump_version('recommendations')
+    return total
+
+
+def for_user(user, exclude=()):
+    """Рекомендации для страницы одним запросом по индексу (user, rank).
+
+    Таблица пересчитывается пакетно, поэтому авторы, на которых
+    пользователь подписался после пересчёта, отсеиваются по графу подписок.
+    """
+    if not user.is_authenticated:
+        return []
+    rows = Recommendation.objects.filter(user=user).select_related(
+        'author'
+    )[:settings.RECOMMENDATIONS_SHOWN + len(exclude)]
+    authors = [row.author for row in rows if row.author_id not in exclude]
+    if not authors:
+        return []
+    followed = follows.following_many(
+        user.pk, [author.pk for author in authors]
+    )
+    return [
+        author for author in authors if author.pk not in followed
+    ][:settings.RECOMMENDATIONS_SHOWN]
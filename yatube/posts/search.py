@@ -0,0 +1,189 @@
+import re
+
+from django.core import signing
+from django.db import connection
+from django.db.models.expressions import RawSQL
+
+SEARCH_SALT = 'posts.search'
+TABLES = {
+    'post': 'posts_post_fts',
+    'comment': 'posts_comment_fts',
+}
+
+WORD = re.compile(r'\w+')
+VOWELS = 'аеиоуыэюя'
+PERFECTIVE_GERUND = re.compile(
+    r'(ив|ивши|ившись|ыв|ывши|ывшись|(?<=[ая])(в|вши|вшись))$'
+)
+REFLEXIVE = re.compile(r'(ся|сь)$')
+ADJECTIVE = re.compile(
+    r'(ее|ие|ые|ое|ими|ыми|ей|ий|ый|ой|ем|им|ым|ом|его|ого|ему|ому|их|ых'
+    r'|ую|юю|ая|яя|ою|ею)$'
+)
+PARTICIPLE = re.compile(r'(ивш|ывш|ующ|(?<=[ая])(ем|нн|вш|ющ|щ))$')
+VERB = re.compile(
+    r'(ила|ыла|ена|ейте|уйте|ите|или|ыли|ей|уй|ил|ыл|им|ым|ен|ило|ыло|ено'
+    r'|ят|ует|уют|ит|ыт|ены|ить|ыть|ишь|ую|ю'
+    r'|(?<=[ая])(ла|на|ете|йте|ли|й|л|ем|н|ло|но|ет|ют|ны|ть|ешь|нно))$'
+)
+NOUN = re.compile(
+    r'(а|ев|ов|ие|ье|е|иями|ями|ами|еи|ии|и|ией|ей|ой|ий|й|иям|ям|ием|ем'
+    r'|ам|ом|о|у|ах|иях|ях|ы|ь|ию|ью|ю|ия|ья|я)$'
+)
+DERIVATIONAL = re.compile(r'(ост|ость)$')
+SUPERLATIVE = re.compile(r'(ейш|ейше)$')
+
+
+def _region(word, start=0):
+    """Начало области после первого сочетания «гласная + согласная»."""
+    for index in range(start + 1, len(word)):
+        if word[index] not in VOWELS and word[index - 1] in VOWELS:
+            return index + 1
+    return len(word)
+
+
+def _strip_inflection(rv):
+    if PERFECTIVE_GERUND.search(rv):
+        return PERFECTIVE_GERUND.sub('', rv)
+    rv = REFLEXIVE.sub('', rv)
+    if ADJECTIVE.search(rv):
+        return PARTICIPLE.sub('', ADJECTIVE.sub('', rv))
+    if VERB.search(rv):
+        return VERB.sub('', rv)
+    return NOUN.sub('', rv)
+
+
+def stem(word):
+    """Стеммер Портера (Snowball) для русского языка."""
+    word = word.lower().replace('ё', 'е')
+    for index, letter in enumerate(word):
+        if letter in VOWELS:
+            rv_start = index + 1
+            break
+    else:
+        return word
+    r2_start = _region(word, _region(word))
+    prefix, rv = word[:rv_start], _strip_inflection(word[rv_start:])
+    if rv.endswith('и'):
+        rv = rv[:-1]
+    match = DERIVATIONAL.search(rv)
+    if match and rv_start + match.start() >= r2_start:
+        rv = rv[:match.start()]
+    if rv.endswith('нн'):
+        rv = rv[:-1]
+    elif SUPERLATIVE.search(rv):
+        rv = SUPERLATIVE.sub('', rv)
+        if rv.endswith('нн'):
+            rv = rv[:-1]
+    elif rv.endswith('ь'):
+        rv = rv[:-1]
+    return prefix + rv
+
+
+def normalize(text):
+    """Текст документа в виде основ слов, разделённых пробелами."""
+    return ' '.join(stem(word) for word in WORD.findall(text))
+
+
+def match_expression(query):
+    """Запрос пользователя как выражение FTS5: все основы, по префиксу."""
+    stems = normalize(query).split()
+    return ' '.join('"%s"*' % word.replace('"', '') for word in stems)
+
+
+def is_available():
+    return connection.vendor == 'sqlite'
+
+
+def can_rank(query):
+    """Можно ли ранжировать запрос по индексу: без FTS5 или без единого
+    слова в запросе поиск идёт через icontains."""
+    return is_available() and bool(match_expression(query))
+
+
+def index(kind, pk, text):
+    """Добавляет или обновляет документ в индексе."""
+    if not is_available():
+        return
+    table = TABLES[kind]
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {table} WHERE rowid = %s', [pk])
+        cursor.execute(
+            f'INSERT INTO {table} (rowid, body) VALUES (%s, %s)',
+            [pk, normalize(text)]
+        )
+
+
+def remove(kind, pk):
+    if not is_available():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {TABLES[kind]} WHERE rowid = %s', [pk])
+
+
+def rebuild(kind, queryset, batch_size=1000):
+    """Переиндексирует все документы ``queryset`` (поля ``pk`` и ``text``)."""
+    if not is_available():
+        return
+    table = TABLES[kind]
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {table}')
+        batch = []
+        for pk, text in queryset.values_list('pk', 'text').iterator():
+            batch.append((pk, normalize(text)))
+            if len(batch) >= batch_size:
+                cursor.executemany(
+                    f'INSERT INTO {table} (rowid, body) VALUES (%s, %s)',
+                    batch
+                )
+                batch = []
+        if batch:
+            cursor.executemany(
+                f'INSERT INTO {table} (rowid, body) VALUES (%s, %s)', batch
+            )
+
+
+def filter_queryset(kind, queryset, query):
+    """Оставляет в ``queryset`` документы, найденные в индексе."""
+    if not can_rank(query):
+        return queryset.filter(text__icontains=query)
+    expression = match_expression(query)
+    table = TABLES[kind]
+    return queryset.filter(pk__in=RawSQL(
+        f'SELECT rowid FROM {table} WHERE {table} MATCH %s', [expression]
+    ))
+
+
+def ranked_ids(kind, query, cursor=None, limit=10):
+    """Идентификаторы документов по убыванию релевантности (BM25).
+
+    Возвращает пару ``(ids, next_cursor)``; курсор хранит ранг и rowid
+    последнего документа, поэтому следующая страница выбирается без OFFSET.
+    """
+    if not can_rank(query):
+        return [], None
+    table = TABLES[kind]
+    params = [match_expression(query)]
+    seek = ''
+    if cursor:
+        try:
+            rank, rowid = signing.loads(cursor, salt=SEARCH_SALT)
+            params += [float(rank), float(rank), int(rowid)]
+            seek = 'WHERE rank > %s OR (rank = %s AND rowid > %s)'
+        except (signing.BadSignature, TypeError, ValueError):
+            pass
+    with connection.cursor() as db:
+        db.execute(
+            f'SELECT rowid, rank FROM ('
+            f'SELECT rowid, bm25({table}) AS rank FROM {table} '
+            f'WHERE {table} MATCH %s) {seek} '
+            f'ORDER BY rank, rowid LIMIT {int(limit) + 1}',
+            params
+        )
+        rows = db.fetchall()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        rowid, rank = rows[-1]
+        next_cursor = signing.dumps([rank, rowid], salt=SEARCH_SALT)
+    return [rowid for rowid, rank in rows], next_cursor
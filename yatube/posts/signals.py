@@ -0,0 +1,103 @@
+from django.db.models.signals import (
+    post_delete, post_save, pre_delete, pre_save
+)
+from django.dispatch import receiver
+from django.utils import timezone
+
+from . import search, stats, timeline, trending
+from .cache import bump_version
+from .models import Comment, Follow, Group, Post, User
+
+NAME_FIELDS = ('username', 'first_name', 'last_name')
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def feed_changed(sender, **kwargs):
+    bump_version('posts')
+
+
+@receiver(post_save, sender=Group)
+@receiver(pre_delete, sender=Group)
+def group_changed(sender, instance, raw=False, **kwargs):
+    """Карточки постов сообщества показывают его название и адрес."""
+    # У нового сообщества постов нет; pre_delete не передаёт ``created``.
+    if not raw and not kwargs.get('created'):
+        instance.posts.update(updated=timezone.now())
+
+
+@receiver(pre_save, sender=User)
+def remember_names(sender, instance, raw=False, update_fields=None,
+                   **kwargs):
+    # Вход сохраняет только ``last_login``: имя не трогается, лишний
+    # запрос не нужен.
+    if raw or instance.pk is None or (
+        update_fields is not None and not set(NAME_FIELDS) & update_fields
+    ):
+        return
+    instance._saved_names = User.objects.filter(pk=instance.pk).values_list(
+        *NAME_FIELDS
+    ).first()
+
+
+@receiver(post_save, sender=User)
+def user_renamed(sender, instance, **kwargs):
+    """Ленты в кэше показывают имя автора у каждого поста."""
+    saved = instance.__dict__.pop('_saved_names', None)
+    names = tuple(getattr(instance, field) for field in NAME_FIELDS)
+    if saved is not None and saved != names:
+        bump_version('posts')
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_save, sender=Comment)
+def index_text(sender, instance, raw=False, **kwargs):
+    if not raw:
+        search.index(sender._meta.model_name, instance.pk, instance.text)
+
+
+@receiver(post_delete, sender=Post)
+@receiver(post_delete, sender=Comment)
+def unindex_text(sender, instance, **kwargs):
+    search.remove(sender._meta.model_name, instance.pk)
+
+
+@receiver(post_save, sender=Post)
+def post_created(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        timeline.fan_out_post(instance)
+        stats.change(instance.author_id, posts_count=1)
+        trending.post_added(instance)
+
+
+@receiver(post_save, sender=Comment)
+def comment_created(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        trending.comment_added(instance)
+
+
+@receiver(post_delete, sender=Post)
+def post_deleted(sender, instance, **kwargs):
+    stats.change(instance.author_id, posts_count=-1)
+
+
+@receiver(post_save, sender=Follow)
+def follow_created(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        timeline.backfill(instance.user_id, instance.author_id)
+        bump_version(f'follows:{instance.user_id}')
+        stats.change(instance.author_id, followers_count=1)
+        stats.change(instance.user_id, following_count=1)
+        trending.followed(instance.author_id)
+
+
+@receiver(post_delete, sender=Follow)
+def follow_deleted(sender, instance, **kwargs):
+    timeline.prune(instance.user_id, instance.author_id)
+    bump_version(f'follows:{instance.user_id}')
+    stats.change(instance.author_id, followers_count=-1)
+    stats.change(instance.user_id, following_count=-1)
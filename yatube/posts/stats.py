@@ -0,0 +1,100 @@
+from django.db import transaction
+from django.db.models import Count, F
+from django.db.models.functions import Greatest
+
+from .models import Follow, Post, User, UserStats
+
+
+def counts(user_ids):
+    """Счётчики пользователей по реальным данным: ``{id: {поле: значение}}``.
+    """
+    user_ids = list(user_ids)
+    posts = dict(
+        Post.objects.filter(author__in=user_ids).order_by()
+        .values_list('author').annotate(Count('pk'))
+    )
+    followers = dict(
+        Follow.objects.filter(author__in=user_ids).order_by()
+        .values_list('author').annotate(Count('pk'))
+    )
+    following = dict(
+        Follow.objects.filter(user__in=user_ids).order_by()
+        .values_list('user').annotate(Count('pk'))
+    )
+    return {
+        user_id: {
+            'posts_count': posts.get(user_id, 0),
+            'followers_count': followers.get(user_id, 0),
+            'following_count': following.get(user_id, 0),
+        }
+        for user_id in User.objects.filter(pk__in=user_ids).values_list(
+            'pk', flat=True
+        )
+    }
+
+
+def recount(user_ids):
+    """Пересчитывает счётчики пользователей по реальным данным."""
+    user_ids = list(user_ids)
+    stats = [
+        UserStats(user_id=user_id, **fields)
+        for user_id, fields in counts(user_ids).items()
+    ]
+    with transaction.atomic():
+        UserStats.objects.filter(user__in=user_ids).delete()
+        UserStats.objects.bulk_create(stats)
+    return stats
+
+
+def _create(user_id):
+    """Создаёт недостающую строку счётчиков; параллельно созданная строка
+    не трогается. Возвращает ``(строка, создана ли)``."""
+    fields = counts([user_id]).get(user_id)
+    if fields is None:
+        return None, False
+    return UserStats.objects.get_or_create(user_id=user_id, defaults=fields)
+
+
+def change(user_id, **deltas):
+    """Атомарно сдвигает счётчики пользователя: ``change(1, posts_count=1)``.
+
+    Значения не опускаются ниже нуля, даже если счётчик разошёлся
+    с данными. Если строки ещё нет, она создаётся пересчётом, который уже
+    учитывает изменение, вызвавшее сигнал; если её успел создать
+    параллельный запрос, сдвиг применяется к ней. При уменьшении
+    отсутствующая строка не создаётся: удаление может быть частью удаления
+    самого пользователя.
+    """
+    expressions = {
+        name: Greatest(F(name) + delta, 0) for name, delta in deltas.items()
+    }
+    if UserStats.objects.filter(user_id=user_id).update(**expressions):
+        return
+    if not all(delta > 0 for delta in deltas.values()):
+        return
+    _, created = _create(user_id)
+    if not created:
+        UserStats.objects.filter(user_id=user_id).update(**expressions)
+
+
+def get_stats(user):
+    try:
+        return user.stats
+    except UserStats.DoesNotExist:
+        return _create(user.pk)[0]
+
+
+def recount_all(chunk_size=1000):
+    """Пересчитывает счётчики всех пользователей пачками по ``pk``."""
+    last_pk = 0
+    total = 0
+    while True:
+        user_ids = list(
+            User.objects.filter(pk__gt=last_pk).order_by('pk')
+            .values_list('pk', flat=True)[:chunk_size]
+        )
+        if not user_ids:
+            return total
+        recount(user_ids)
+        total += len(user_ids)
+        last_pk = user_ids[-1]
@@ -0,0 +1,132 @@
+import shutil
+import tempfile
+import threading
+import time
+from unittest import mock
+
+from django.conf import settings
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+
+from posts.cache import get_version, version_timeout
+from yatube.cache_backends import SQLiteCache
+
+
+class SQLiteCacheTests(SimpleTestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.cache = self.make_cache()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def make_cache(self, **options):
+        return SQLiteCache(
+            f'{self.directory}/cache.sqlite3', {'OPTIONS': options}
+        )
+
+    def test_set_get_add_delete(self):
+        """Базовые операции кэша."""
+        self.cache.set('key', {'value': 1})
+        self.assertEqual(self.cache.get('key'), {'value': 1})
+        self.assertFalse(self.cache.add('key', 'other'))
+        self.assertTrue(self.cache.add('new', 'value'))
+        self.assertEqual(
+            self.cache.get_many(['key', 'new', 'missing']),
+            {'key': {'value': 1}, 'new': 'value'}
+        )
+        self.cache.delete('key')
+        self.assertIsNone(self.cache.get('key'))
+
+    def test_expired_key_is_missing(self):
+        """Просроченный ключ не возвращается."""
+        self.cache.set('key', 'value', 0.01)
+        time.sleep(0.02)
+        self.assertIsNone(self.cache.get('key'))
+        self.assertTrue(self.cache.add('key', 'fresh'))
+
+    def test_incr_is_atomic_between_connections(self):
+        """incr из разных соединений не теряет обновлений."""
+        self.cache.set('counter', 0, None)
+
+        def worker():
+            cache = self.make_cache()
+            for _ in range(50):
+                cache.incr('counter')
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(self.cache.get('counter'), 200)
+        with self.assertRaises(ValueError):
+            self.cache.incr('missing')
+
+    def test_eviction_keeps_recently_used(self):
+        """При превышении бюджета вытесняются давно не читавшиеся ключи."""
+        cache = self.make_cache(MAX_BYTES=4000)
+        cache.set('hot', 'x' * 500)
+        for i in range(20):
+            cache._db.execute(
+                'UPDATE cache SET accessed = ? WHERE key = ?',
+                (time.time() + 1, cache.make_key('hot'))
+            )
+            cache.set(f'cold:{i}', 'x' * 500)
+        total, = cache._db.execute(
+            'SELECT total FROM cache_size'
+        ).fetchone()
+        self.assertLessEqual(total, 4000)
+        self.assertIsNotNone(cache.get('hot'))
+        self.assertIsNone(cache.get('cold:0'))
+
+    def test_get_many_refreshes_access_time(self):
+        """get_many отмечает прочитанные ключи для LRU, как и get."""
+        self.cache.set('hot', 'value')
+        self.cache._db.execute(
+            'UPDATE cache SET accessed = 0 WHERE key = ?',
+            (self.cache.make_key('hot'),)
+        )
+        self.cache.get_many(['hot', 'missing'])
+        accessed, = self.cache._db.execute(
+            'SELECT accessed FROM cache WHERE key = ?',
+            (self.cache.make_key('hot'),)
+        ).fetchone()
+        self.assertGreater(accessed, 0)
+
+    def test_get_many_splits_long_key_lists(self):
+        """Длинный список ключей не упирается в лимит параметров SQLite."""
+        self.cache.MAX_VARIABLES = 100
+        self.cache.set_many({f'key:{i}': i for i in range(1200)})
+        self.cache._db.execute('UPDATE cache SET accessed = 0')
+        found = self.cache.get_many(
+            [f'key:{i}' for i in range(1200)] + ['missing']
+        )
+        self.assertEqual(len(found), 1200)
+        self.assertEqual(found['key:1199'], 1199)
+        stale, = self.cache._db.execute(
+            'SELECT COUNT(*) FROM cache WHERE accessed = 0'
+        ).fetchone()
+        self.assertEqual(stale, 0)
+
+
+class VersionTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_local_versions_expire(self):
+        """С кэшем процесса версия сменяется сама через заданный срок."""
+        with mock.patch('time.time', return_value=1000.0):
+            version = get_version('posts')
+            self.assertEqual(get_version('posts'), version)
+        later = 1001.0 + settings.POSTS_LOCAL_VERSION_TIMEOUT
+        with mock.patch('time.time', return_value=later):
+            self.assertNotEqual(get_version('posts'), version)
+
+    @override_settings(CACHES={'default': {
+        'BACKEND': 'yatube.cache_backends.SQLiteCache',
+        'LOCATION': ':memory:',
+    }})
+    def test_shared_versions_do_not_expire(self):
+        """Общий кэш хранит версии, пока их не поднимут."""
+        self.assertIsNone(version_timeout())
@@ -0,0 +1,168 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from posts import advisor, benchmark, search
+from posts.models import Comment, Follow, Post, TimelineEntry, User, UserStats
+
+
+class ImportDataTests(TestCase):
+    def setUp(self):
+        records = [
+            {'model': 'users', 'username': 'author'},
+            {'model': 'users', 'username': 'reader'},
+            {'model': 'groups', 'title': 'Группа', 'slug': 'group'},
+            {'model': 'follows', 'user': 'reader', 'author': 'author'},
+            {'model': 'follows', 'user': 'reader', 'author': 'ghost'},
+        ]
+        records += [
+            {
+                'model': 'posts', 'id': 100 + i, 'author': 'author',
+                'group': 'group', 'text': f'Импортированный пост {i}',
+                'pub_date': f'2020-01-0{i + 1}T10:00:00+00:00',
+            }
+            for i in range(3)
+        ]
+        records += [
+            {
+                'model': 'comments', 'post': 100, 'author': 'reader',
+                'text': 'Комментарий', 'created': '2020-02-01T10:00:00Z',
+            },
+            {
+                'model': 'comments', 'post': 999, 'author': 'reader',
+                'text': 'Комментарий к чужому посту',
+            },
+        ]
+        handle, self.path = tempfile.mkstemp(suffix='.jsonl')
+        with os.fdopen(handle, 'w', encoding='utf-8') as file:
+            for record in records:
+                file.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def test_import_loads_rows_and_rebuilds_derived_data(self):
+        """Импорт загружает строки пачками и пересобирает производные."""
+        output = StringIO()
+        call_command(
+            'import_data', self.path, batch_size=2, skip_thumbnails=True,
+            stdout=output
+        )
+        author = User.objects.get(username='author')
+        reader = User.objects.get(username='reader')
+        self.assertEqual(author.posts.count(), 3)
+        self.assertEqual(Comment.objects.count(), 1)
+        self.assertEqual(Follow.objects.count(), 1)
+        self.assertEqual(
+            Post.objects.get(pk=100).pub_date.isoformat(),
+            '2020-01-01T10:00:00+00:00'
+        )
+        self.assertEqual(UserStats.objects.get(user=author).posts_count, 3)
+        self.assertEqual(
+            TimelineEntry.objects.filter(user=reader).count(), 3
+        )
+        ids, _ = search.ranked_ids('post', 'импорт')
+        self.assertEqual(len(ids), 3)
+        self.assertIn('строк/с', output.getvalue())
+        self.assertIn('follows: загружено 1, пропущено 1', output.getvalue())
+
+    def test_import_remaps_colliding_ids_and_keeps_dates(self):
+        """Занятые id постов заменяются новыми, комментарии идут за ними,
+        дубли пропускаются, даты берутся из файла."""
+        owner = User.objects.create(username='owner')
+        Post.objects.create(pk=100, text='Уже в базе', author=owner)
+        with open(self.path, 'a', encoding='utf-8') as file:
+            for record in (
+                {'model': 'users', 'username': 'late',
+                 'date_joined': '2019-05-01T00:00:00+00:00'},
+                {'model': 'follows', 'user': 'reader', 'author': 'author'},
+                {'model': 'posts', 'author': 'late', 'text': 'Без id'},
+                {'model': 'posts', 'id': 101, 'author': 'late',
+                 'text': 'Дубль'},
+            ):
+                file.write(json.dumps(record, ensure_ascii=False) + '\n')
+        output = StringIO()
+        call_command(
+            'import_data', self.path, batch_size=2, skip_thumbnails=True,
+            stdout=output
+        )
+        self.assertEqual(Post.objects.get(pk=100).text, 'Уже в базе')
+        self.assertIn('posts: загружено 4, пропущено 1', output.getvalue())
+        self.assertIn('follows: загружено 1, пропущено 2', output.getvalue())
+        self.assertTrue(Post.objects.filter(text='Без id').exists())
+        self.assertEqual(
+            User.objects.get(username='late').date_joined.year, 2019
+        )
+        comment = Comment.objects.select_related('post').get()
+        self.assertEqual(comment.post.text, 'Импортированный пост 0')
+        self.assertEqual(
+            comment.created.isoformat(), '2020-02-01T10:00:00+00:00'
+        )
+
+    def test_generate_thumbnails_reports_count(self):
+        """Команда миниатюр сообщает, сколько картинок обработала."""
+        output = StringIO()
+        call_command('generate_thumbnails', stdout=output)
+        self.assertIn('Обработано картинок: 0', output.getvalue())
+
+
+class RouteBenchmarkTests(TestCase):
+    def setUp(self):
+        benchmark.seed(users=5, groups=2, posts=12, comments=20, follows=5)
+
+    def test_every_route_is_measured(self):
+        """Бенчмарк обходит все именованные маршруты приложений."""
+        results = benchmark.run(iterations=1, warmup=0)
+        self.assertEqual(
+            set(results), {name for name, pattern in benchmark.routes()}
+        )
+        self.assertEqual(results['posts:index']['status'], 200)
+        self.assertEqual(results['posts:profile_unfollow']['status'], 302)
+        self.assertGreater(results['posts:index']['queries'], 0)
+        self.assertGreater(results['about:tech']['bytes'], 0)
+
+    @override_settings(REPLICA_DATABASES=['replica_missing'])
+    def test_reads_stay_on_seeded_database(self):
+        """Настроенные реплики не уводят чтения бенчмарка из его базы."""
+        results = benchmark.run(iterations=1, warmup=0)
+        self.assertEqual(results['posts:index']['status'], 200)
+
+    def test_compare_reports_regressions(self):
+        """Лишний запрос и рост p95 сверх допуска считаются регрессией."""
+        baseline = {'posts:index': {'p95_ms': 10, 'queries': 5, 'bytes': 100}}
+        results = {'posts:index': {'p95_ms': 11, 'queries': 5, 'bytes': 100}}
+        self.assertEqual(benchmark.compare(results, baseline, 0.2), [])
+        results['posts:index'].update(p95_ms=13, queries=6)
+        self.assertEqual(len(benchmark.compare(results, baseline, 0.2)), 2)
+
+
+class QueryAdvisorTests(TestCase):
+    def test_problems_in_plan(self):
+        """Полные обходы и временные B-деревья попадают в замечания."""
+        plan = [
+            'SCAN posts_post',
+            'SCAN posts_post USING INDEX post_author_pub_date_idx',
+            'SCAN posts_post_fts VIRTUAL TABLE INDEX 0:M1',
+            'USE TEMP B-TREE FOR ORDER BY',
+        ]
+        self.assertEqual(advisor.problems(plan), [
+            'полный обход posts_post',
+            'временное B-дерево для ORDER BY',
+        ])
+
+    def test_feed_queries_use_indexes(self):
+        """Ленты автора, группы и комментарии читаются без сортировок."""
+        benchmark.seed(users=5, groups=2, posts=30, comments=40, follows=5)
+        report = advisor.analyze()
+        for name in ('posts:group_posts', 'posts:profile', 'posts:post',
+                     'posts:comments', 'posts:follow_index'):
+            with self.subTest(route=name):
+                self.assertEqual(
+                    [problem for sql, plan, found in report[name]
+                     for problem in found],
+                    []
+                )
@@ -0,0 +1,119 @@
+from unittest import mock
+
+from django.db import DatabaseError, connection, connections
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts import counters
+from posts.models import Post, User
+
+
+@override_settings(
+    POST_VIEWS_FLUSH_THRESHOLD=5, POST_VIEWS_FLUSH_INTERVAL=3600
+)
+class PostViewCounterTests(TestCase):
+    def setUp(self):
+        counters.clear()
+        author = User.objects.create_user(username='author')
+        self.posts = [
+            Post.objects.create(text=f'Пост {i}', author=author)
+            for i in range(3)
+        ]
+
+    def views(self, post):
+        post.refresh_from_db()
+        return post.views
+
+    def test_increments_are_buffered_and_merged_on_read(self):
+        """Просмотры ниже порога копятся без запросов, но уже видны."""
+        post = self.posts[0]
+        with self.assertNumQueries(0):
+            for _ in range(3):
+                counters.increment(post.pk)
+        self.assertEqual(self.views(post), 0)
+        self.assertEqual(counters.views(post), 3)
+
+    def test_threshold_flushes_batch(self):
+        """Порог сбрасывает буфер одним UPDATE на величину прироста."""
+        first, second, third = self.posts
+        counters.increment(first.pk, 2)
+        counters.increment(second.pk, 2)
+        with CaptureQueriesContext(connection) as queries:
+            counters.increment(third.pk)
+        updates = [
+            query for query in queries if query['sql'].startswith('UPDATE')
+        ]
+        self.assertEqual(len(updates), 2)
+        self.assertEqual(
+            [self.views(post) for post in self.posts], [2, 2, 1]
+        )
+        self.assertEqual(counters.pending(first.pk), 0)
+
+    @override_settings(POST_VIEWS_FLUSH_INTERVAL=0)
+    def test_interval_flushes(self):
+        counters.increment(self.posts[0].pk)
+        self.assertEqual(self.views(self.posts[0]), 1)
+
+    def test_failed_flush_keeps_increments(self):
+        """Неудачная запись возвращает просмотры в буфер."""
+        post = self.posts[0]
+        counters.increment(post.pk, 2)
+        with mock.patch.object(
+            Post.objects, 'using', side_effect=DatabaseError
+        ), self.assertLogs('posts.counters', 'ERROR'):
+            self.assertEqual(counters.flush(), 0)
+        self.assertEqual(counters.pending(post.pk), 2)
+        counters.flush()
+        self.assertEqual(self.views(post), 2)
+
+    def test_timer_flushes_idle_buffer(self):
+        """Первый просмотр в пустой буфер ставит таймер сброса."""
+        post = self.posts[0]
+        with mock.patch('posts.counters.threading.Timer') as timer:
+            counters.increment(post.pk)
+            counters.increment(post.pk)
+        timer.assert_called_once()
+        interval, callback = timer.call_args[0]
+        self.assertEqual(interval, 3600)
+        # Таймер закрывает соединение своего потока; здесь это соединение
+        # теста.
+        with mock.patch.object(connections['default'], 'close'):
+            callback()
+        self.assertEqual(self.views(post), 2)
+
+    def test_post_page_counts_views(self):
+        """Страница поста считает просмотры и показывает их вместе
+        с буфером."""
+        post = self.posts[0]
+        url = reverse('posts:post', args=[post.author.username, post.pk])
+        self.client.get(url)
+        self.assertContains(self.client.get(url), 'Просмотров: 1')
+        self.assertEqual(counters.pending(post.pk), 2)
+        counters.flush()
+        self.assertContains(self.client.get(url), 'Просмотров: 2')
+
+    def test_not_modified_page_counts_view(self):
+        """Повторный визит с If-None-Match получает 304 и тоже считается.
+        """
+        post = self.posts[0]
+        url = reverse('posts:post', args=[post.author.username, post.pk])
+        etag = self.client.get(url)['ETag']
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(counters.pending(post.pk), 2)
+        counters.increment(self.posts[1].pk)
+        counters.flush()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_flush_keeps_other_pages_valid(self):
+        """Запись просмотров одного поста не сбрасывает ETag остальных."""
+        post = self.posts[0]
+        url = reverse('posts:post', args=[post.author.username, post.pk])
+        etag = self.client.get(url)['ETag']
+        counters.clear()
+        counters.increment(self.posts[1].pk)
+        counters.flush()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
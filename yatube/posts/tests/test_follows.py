@@ -0,0 +1,120 @@
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts import follows
+from posts.models import Follow, User
+
+
+class FollowGraphTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        follows.clear()
+        self.user = User.objects.create_user(username='reader')
+        self.authors = [
+            User.objects.create_user(username=f'author_{i}')
+            for i in range(4)
+        ]
+        for author in self.authors[:2]:
+            Follow.objects.create(user=self.user, author=author)
+
+    def test_warm_graph_answers_without_queries(self):
+        """Прочитанный граф отвечает на проверки без запросов к БД."""
+        ids = [author.pk for author in self.authors]
+        follows.followees(self.user.pk)
+        with self.assertNumQueries(0):
+            self.assertTrue(
+                follows.is_following(self.user.pk, self.authors[0].pk)
+            )
+            self.assertEqual(
+                follows.following_many(self.user.pk, ids), set(ids[:2])
+            )
+
+    def test_follow_and_unfollow_invalidate_graph(self):
+        """Подписка и отписка сразу видны в графе."""
+        author = self.authors[3]
+        self.assertFalse(follows.is_following(self.user.pk, author.pk))
+        self.assertTrue(follows.follow(self.user, author))
+        self.assertTrue(follows.is_following(self.user.pk, author.pk))
+        self.assertFalse(follows.follow(self.user, author))
+        self.assertTrue(follows.unfollow(self.user, author))
+        self.assertFalse(follows.is_following(self.user.pk, author.pk))
+
+    def test_anonymous_and_self_follow_nobody(self):
+        """Аноним и сам автор не подписаны, граф при этом не читается."""
+        with self.assertNumQueries(0):
+            self.assertFalse(follows.is_following(None, self.user.pk))
+            self.assertFalse(
+                follows.is_following(self.user.pk, self.user.pk)
+            )
+
+    def test_unfollow_without_follow_redirects(self):
+        """Отписка от автора без подписки не падает с 404."""
+        client = Client()
+        client.force_login(self.user)
+        author = self.authors[3]
+        response = client.get(
+            reverse('posts:profile_unfollow', args=[author.username])
+        )
+        self.assertRedirects(
+            response, reverse('posts:profile', args=[author.username])
+        )
+
+
+@override_settings(FOLLOW_LIST_PAGINATOR=2)
+class FollowListTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='author')
+        cls.viewer = User.objects.create_user(username='viewer')
+        cls.fans = [
+            User.objects.create_user(username=f'fan_{i}') for i in range(5)
+        ]
+        for fan in cls.fans:
+            Follow.objects.create(user=fan, author=cls.author)
+        Follow.objects.create(user=cls.viewer, author=cls.fans[-1])
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.viewer)
+
+    def test_followers_are_listed_newest_first_by_cursor(self):
+        """Подписчики листаются курсором от новых к старым."""
+        url = reverse('posts:followers', args=[self.author.username])
+        seen = []
+        response = self.client.get(url)
+        while True:
+            seen += [person.username for person in response.context['people']]
+            page = response.context['page']
+            if not page.has_next():
+                break
+            response = self.client.get(url, {'cursor': page.next_cursor})
+        self.assertEqual(
+            seen, [fan.username for fan in reversed(self.fans)]
+        )
+
+    def test_viewer_follow_state_is_batched(self):
+        """Подписка зрителя на каждого в списке решается без запроса
+        на человека."""
+        # Автор, страница списка, сессия, зритель и граф его подписок.
+        with self.assertNumQueries(5):
+            response = self.client.get(
+                reverse('posts:followers', args=[self.author.username])
+            )
+        flags = {
+            person.username: person.viewer_follows
+            for person in response.context['people']
+        }
+        self.assertEqual(flags, {'fan_4': True, 'fan_3': False})
+
+    def test_following_lists_authors(self):
+        """Список подписок показывает авторов, на которых подписан человек.
+        """
+        response = self.client.get(
+            reverse('posts:following', args=[self.fans[0].username])
+        )
+        self.assertEqual(
+            [person.username for person in response.context['people']],
+            ['author']
+        )
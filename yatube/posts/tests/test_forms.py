@@ -1,14 +1,21 @@
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.core.files.uploadedfile import SimpleUploadedFile
-from django.test import Client, TestCase
+from django.test import Client, TestCase, override_settings
 from django.urls import reverse
 from http import HTTPStatus
 
+import shutil
+import tempfile
+
 from posts.models import Group, Post
 
 User = get_user_model()
 
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
 
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
 class PostFormTest(TestCase):
     @classmethod
     def setUpClass(cls):
@@ -41,6 +48,11 @@ class PostFormTest(TestCase):
             group=cls.group
         )
 
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
     def test_create_post(self):
         """Тест на создание поста и редирект на главную страницу"""
         posts_count = Post.objects.count()
@@ -0,0 +1,113 @@
+import json
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.http import HttpResponse
+from django.test import Client, RequestFactory, TestCase, override_settings
+
+from django.template.backends.django import Template
+
+from posts.models import Post, User
+from yatube import middleware
+from yatube.middleware import ReplicaRoutingMiddleware
+from yatube.routers import PrimaryReplicaRouter
+
+
+class TimingMiddlewareTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='author')
+        Post.objects.create(text='Пост', author=self.user)
+        self.client = Client()
+
+    @override_settings(TIMING_SAMPLE_RATE=1)
+    def test_sampled_request_has_server_timing(self):
+        """Замеренный запрос отдаёт Server-Timing и пишет строку в журнал."""
+        with self.assertLogs('yatube.timing', 'INFO') as logs:
+            response = self.client.get('/')
+        header = response['Server-Timing']
+        for metric in ('db;dur=', 'tpl;dur=', 'cache;dur=', 'total;dur='):
+            self.assertIn(metric, header)
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual(record['path'], '/')
+        self.assertEqual(record['status'], 200)
+        self.assertGreater(record['queries'], 0)
+        self.assertGreater(record['template_ms'], 0)
+        self.assertGreater(record['cache_misses'], 0)
+
+        with self.assertLogs('yatube.timing', 'INFO') as logs:
+            self.client.get('/')
+        record = json.loads(logs.records[0].getMessage())
+        self.assertGreater(record['cache_hits'], 0)
+
+    @override_settings(TIMING_SAMPLE_RATE=0)
+    def test_unsampled_request_is_not_measured(self):
+        """Вне выборки заголовок не добавляется."""
+        response = self.client.get('/')
+        self.assertNotIn('Server-Timing', response)
+
+    def test_get_many_through_get_is_counted_once(self):
+        """get_many, читающий ключи через get, не считается дважды."""
+        cache.set('present', 1)
+        timing = middleware.Timing()
+        middleware._state.timing = timing
+        try:
+            with middleware.instrumented():
+                cache.get_many(['present', 'missing'])
+        finally:
+            middleware._state.timing = None
+        self.assertEqual((timing.cache_hits, timing.cache_misses), (1, 1))
+
+    @override_settings(TIMING_SAMPLE_RATE=1)
+    def test_wrappers_are_removed_after_request(self):
+        """Обёртки стоят только на время замеряемого запроса."""
+        render = Template.render
+        with self.assertLogs('yatube.timing', 'INFO'):
+            self.client.get('/')
+        self.assertIs(Template.render, render)
+        self.assertFalse(getattr(type(caches['default']).get, 'timed', False))
+
+
+@override_settings(REPLICA_DATABASES=['replica'])
+class ReplicaRoutingTests(TestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.router = PrimaryReplicaRouter()
+        self.seen = []
+
+    def view(self, request):
+        self.seen.append(self.router.db_for_read(Post))
+        if request.method == 'POST' or 'write' in request.GET:
+            self.router.db_for_write(Post)
+            self.seen.append(self.router.db_for_read(Post))
+        return HttpResponse()
+
+    def call(self, request):
+        return ReplicaRoutingMiddleware(self.view)(request)
+
+    def test_get_reads_from_replica(self):
+        """GET-запрос без записи читает с реплики и не ставит cookie."""
+        response = self.call(self.factory.get('/'))
+        self.assertEqual(self.seen, ['replica'])
+        self.assertNotIn(settings.REPLICA_STICKY_COOKIE, response.cookies)
+
+    def test_write_pins_primary(self):
+        """После записи чтение идёт в основную базу, cookie закрепляет её."""
+        response = self.call(self.factory.post('/'))
+        self.assertEqual(self.seen, ['default', 'default'])
+        self.assertIn(settings.REPLICA_STICKY_COOKIE, response.cookies)
+
+        self.seen = []
+        self.call(self.factory.get('/?write=1'))
+        self.assertEqual(self.seen, ['replica', 'default'])
+
+    def test_sticky_cookie_reads_primary(self):
+        """Пока жива cookie после записи, GET читает основную базу."""
+        request = self.factory.get('/')
+        request.COOKIES[settings.REPLICA_STICKY_COOKIE] = '1'
+        self.call(request)
+        self.assertEqual(self.seen, ['default'])
+
+    def test_reads_outside_request_use_primary(self):
+        """Вне запроса (команды, фоновые потоки) реплики не используются."""
+        self.assertEqual(self.router.db_for_read(Post), 'default')
@@ -1,6 +1,10 @@
+from io import StringIO
+
+from django.core.management import call_command
 from django.test import TestCase
 
-from posts.models import Group, Post, User
+from posts import stats
+from posts.models import Follow, Group, Post, User, UserStats
 
 
 class PostModelTests(TestCase):
@@ -25,3 +29,52 @@ class PostModelTests(TestCase):
         group = PostModelTests.group
         expected_str = group.title
         self.assertEqual(expected_str, str(group))
+
+
+class UserStatsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create(username='author')
+        cls.reader = User.objects.create(username='reader')
+
+    def assertStats(self, user, posts, followers, following):
+        stats = UserStats.objects.get(user=user)
+        self.assertEqual(
+            (stats.posts_count, stats.followers_count, stats.following_count),
+            (posts, followers, following)
+        )
+
+    def test_counters_follow_changes(self):
+        """Счётчики меняются при создании и удалении постов и подписок."""
+        post = Post.objects.create(text='text', author=self.author)
+        Post.objects.create(text='text', author=self.author)
+        follow = Follow.objects.create(user=self.reader, author=self.author)
+        self.assertStats(self.author, 2, 1, 0)
+        self.assertStats(self.reader, 0, 0, 1)
+        post.delete()
+        follow.delete()
+        self.assertStats(self.author, 1, 0, 0)
+        self.assertStats(self.reader, 0, 0, 0)
+
+    def test_recount_stats_repairs_counters(self):
+        """Команда recount_stats восстанавливает счётчики."""
+        Post.objects.create(text='text', author=self.author)
+        UserStats.objects.filter(user=self.author).update(posts_count=42)
+        call_command('recount_stats', chunk_size=1, stdout=StringIO())
+        self.assertStats(self.author, 1, 0, 0)
+
+    def test_change_creates_missing_row_once(self):
+        """Сдвиг без строки создаёт её, а уже созданную лишь сдвигает."""
+        Post.objects.create(text='text', author=self.author)
+        UserStats.objects.filter(user=self.author).delete()
+        stats.change(self.author.pk, posts_count=1)
+        self.assertStats(self.author, 1, 0, 0)
+        stats.change(self.author.pk, posts_count=1)
+        self.assertStats(self.author, 2, 0, 0)
+
+    def test_change_never_goes_below_zero(self):
+        """Разошедшийся счётчик не падает на ограничении CHECK."""
+        stats.get_stats(self.reader)
+        stats.change(self.reader.pk, followers_count=-1)
+        self.assertStats(self.reader, 0, 0, 0)
@@ -0,0 +1,109 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts import counters
+from posts import urls as posts_urls
+from posts.models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+# Бюджет SQL-запросов на один запрос к каждому URL из posts/urls.py.
+# Запросы сессии и пользователя авторизованного клиента входят в бюджет.
+# Бюджет равен измеренному числу запросов: и рост, и снижение требуют
+# поправить его здесь, чтобы запас не прятал будущие регрессии.
+QUERY_BUDGETS = {
+    'index': ('get', 5),
+    'error_404': ('get', 2),
+    'error_500': ('get', 2),
+    'group_posts': ('get', 6),
+    'new_post': ('get', 3),
+    'follow_index': ('get', 6),
+    'search': ('get', 5),
+    'trending': ('get', 5),
+    'export': ('get', 2),
+    'profile': ('get', 8),
+    'post': ('get', 6),
+    'edit': ('get', 4),
+    'comments': ('get', 2),
+    'add_comment': ('post', 10),
+    'followers': ('get', 5),
+    'following': ('get', 5),
+    'profile_follow': ('get', 4),
+    'profile_unfollow': ('get', 8),
+}
+
+
+class QueryBudgetTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(
+            title='test_group',
+            slug='test-slug',
+            description='test_desc'
+        )
+        cls.authors = [
+            User.objects.create_user(username=f'author_{i}')
+            for i in range(5)
+        ]
+        for author in cls.authors:
+            Follow.objects.create(user=cls.user, author=author)
+        for i in range(15):
+            post = Post.objects.create(
+                text=f'post {i}',
+                author=cls.authors[i % len(cls.authors)],
+                group=cls.group
+            )
+            for j in range(3):
+                Comment.objects.create(
+                    post=post,
+                    author=cls.authors[j],
+                    text=f'comment {j}'
+                )
+        cls.own_post = Post.objects.create(text='own', author=cls.user)
+        cls.url_kwargs = {
+            'slug': cls.group.slug,
+            'username': cls.user.username,
+            'post_id': cls.own_post.pk,
+            'model': 'posts',
+        }
+
+    def setUp(self):
+        # Сброс буфера просмотров не попадает в бюджет страницы поста.
+        counters.clear()
+        self.client = Client()
+        self.client.force_login(self.user)
+        self.data = {'text': 'comment', 'q': 'post'}
+
+    def reverse(self, name, pattern):
+        kwargs = {
+            key: self.url_kwargs[key]
+            for key in pattern.pattern.converters
+        }
+        if name in ('profile_follow', 'profile_unfollow'):
+            kwargs['username'] = self.authors[0].username
+        return reverse(f'posts:{name}', kwargs=kwargs)
+
+    def test_every_url_has_budget(self):
+        """У каждого URL из posts/urls.py объявлен бюджет запросов."""
+        names = {pattern.name for pattern in posts_urls.urlpatterns}
+        self.assertEqual(names, set(QUERY_BUDGETS))
+
+    def test_urls_fit_query_budget(self):
+        """Страницы делают ровно объявленное число SQL-запросов."""
+        for pattern in posts_urls.urlpatterns:
+            method, budget = QUERY_BUDGETS[pattern.name]
+            url = self.reverse(pattern.name, pattern)
+            cache.clear()
+            with self.subTest(url=url):
+                with CaptureQueriesContext(connection) as queries:
+                    getattr(self.client, method)(url, self.data)
+                self.assertEqual(
+                    len(queries), budget,
+                    '\n'.join(query['sql'] for query in queries)
+                )
@@ -0,0 +1,87 @@
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts import follows
+from posts.models import Follow, Recommendation, User
+from posts.recommendations import FollowGraph, rebuild
+
+
+class RecommendationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        names = ('reader', 'friend_1', 'friend_2', 'star', 'niche', 'loner')
+        cls.users = {
+            name: User.objects.create_user(username=name) for name in names
+        }
+        u = cls.users
+        for user, author in (
+            ('reader', 'friend_1'), ('reader', 'friend_2'),
+            ('friend_1', 'star'), ('friend_2', 'star'),
+            ('friend_1', 'niche'), ('friend_2', 'reader'),
+            ('loner', 'star'),
+        ):
+            Follow.objects.create(user=u[user], author=u[author])
+
+    def setUp(self):
+        cache.clear()
+        follows.clear()
+
+    def suggested(self, name):
+        return list(
+            Recommendation.objects.filter(user=self.users[name])
+            .values_list('author__username', flat=True)
+        )
+
+    def test_friends_of_friends_are_ranked_by_shared_follows(self):
+        """Выше тот, на кого подписано больше авторов из подписок;
+        себя и уже читаемых авторов в рекомендациях нет."""
+        rebuild(chunk_size=2, top_k=3)
+        self.assertEqual(self.suggested('reader'), ['star', 'niche'])
+
+    def test_users_without_candidates_get_popular_authors(self):
+        """Пользователю без кандидатов предлагаются популярные авторы."""
+        rebuild(top_k=2)
+        self.assertEqual(
+            self.suggested('niche'), ['star', 'friend_1']
+        )
+
+    def test_chunk_size_does_not_change_suggestions(self):
+        """Пачка целиком считается так же, как по одному пользователю."""
+        graph = FollowGraph()
+        user_ids = sorted(user.pk for user in self.users.values())
+        together = graph.suggest(user_ids, 3, graph.popular(6))
+        for user_id in user_ids:
+            with self.subTest(user_id=user_id):
+                self.assertEqual(
+                    graph.suggest([user_id], 3, graph.popular(6)),
+                    {user_id: together[user_id]}
+                )
+
+    def test_command_reports_users(self):
+        output = StringIO()
+        call_command('recommend_authors', stdout=output)
+        self.assertIn('для 6 пользователей', output.getvalue())
+
+    def test_profile_hides_authors_followed_after_rebuild(self):
+        """Страница не предлагает автора, на которого уже подписались."""
+        rebuild(top_k=3)
+        client = Client()
+        client.force_login(self.users['reader'])
+        url = reverse('posts:profile', args=['friend_1'])
+        response = client.get(url)
+        self.assertEqual(
+            [user.username for user in response.context['recommended']],
+            ['star', 'niche']
+        )
+        Follow.objects.create(
+            user=self.users['reader'], author=self.users['star']
+        )
+        response = client.get(url)
+        self.assertEqual(
+            [user.username for user in response.context['recommended']],
+            ['niche']
+        )
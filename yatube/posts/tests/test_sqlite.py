@@ -0,0 +1,40 @@
+import os
+import sqlite3
+import tempfile
+
+from django.db import connection, transaction
+from django.test import SimpleTestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+
+from posts.models import Group
+from yatube.sqlite.base import PROFILES, apply_profile
+
+
+class SQLiteProfileTests(SimpleTestCase):
+    def test_concurrent_profile_pragmas(self):
+        """Профиль concurrent включает WAL, busy_timeout и mmap."""
+        with tempfile.TemporaryDirectory() as directory:
+            db = sqlite3.connect(os.path.join(directory, 'test.sqlite3'))
+            apply_profile(db, PROFILES['concurrent'])
+            values = {
+                name: db.execute(f'PRAGMA {name}').fetchone()[0]
+                for name in ('journal_mode', 'busy_timeout', 'synchronous',
+                             'mmap_size')
+            }
+            db.close()
+        self.assertEqual(values, {
+            'journal_mode': 'wal',
+            'busy_timeout': 5000,
+            'synchronous': 1,
+            'mmap_size': 256 * 1024 * 1024,
+        })
+
+
+class ImmediateTransactionTests(TransactionTestCase):
+    def test_atomic_begins_immediate(self):
+        """Транзакции открываются BEGIN IMMEDIATE."""
+        self.assertTrue(connection.profile.get('immediate'))
+        with CaptureQueriesContext(connection) as queries:
+            with transaction.atomic():
+                Group.objects.create(title='Группа', slug='group')
+        self.assertEqual(queries[0]['sql'], 'BEGIN IMMEDIATE')
@@ -0,0 +1,98 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.template import Context, Template
+from django.test import TestCase
+
+from posts.cache import card_key
+from posts.models import Group, Post, User
+from posts.templatetags.post_tags import CARD_TEMPLATE
+
+
+class PostListTagTests(TestCase):
+    def test_post_list_matches_include_per_post(self):
+        """post_list рендерит те же карточки, что и include на каждый пост.
+        """
+        author = User.objects.create_user(username='author')
+        posts = [
+            Post.objects.create(text=f'Пост {i}', author=author)
+            for i in range(3)
+        ]
+        for post in posts:
+            post.comment_count = post.pk
+        context = {'page': posts}
+        included = Template(
+            '{% for post in page %}'
+            '{% include "includes/post_item.html" %}'
+            '{% endfor %}'
+        ).render(Context(context))
+        listed = Template(
+            '{% load post_tags %}{% post_list page %}'
+        ).render(Context(context))
+        self.assertEqual(listed, included)
+        self.assertIn('Комментариев: 3', listed)
+
+
+class PostCardCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username='author')
+        self.post = Post.objects.create(text='Пост', author=self.author)
+        self.post.comment_count = 0
+        self.template = Template('{% load post_tags %}{% post_list page %}')
+
+    def render(self, user=None):
+        return self.template.render(
+            Context({'page': [self.post], 'user': user})
+        )
+
+    def test_second_render_is_served_from_cache(self):
+        """Повторный рендер берёт карточку из кэша, не рендеря шаблон."""
+        first = self.render()
+        with mock.patch(
+            'django.template.engine.Engine.get_template',
+            side_effect=AssertionError('карточка отрендерена заново')
+        ):
+            self.assertEqual(self.render(), first)
+
+    def test_key_changes_with_post_comments_and_viewer(self):
+        """Правка, новый комментарий и автор-зритель дают новый ключ."""
+        keys = {card_key(self.post, None, CARD_TEMPLATE)}
+        keys.add(card_key(self.post, self.author, CARD_TEMPLATE))
+        self.post.comment_count = 1
+        keys.add(card_key(self.post, None, CARD_TEMPLATE))
+        self.post.text = 'Новый текст'
+        self.post.save()
+        keys.add(card_key(self.post, None, CARD_TEMPLATE))
+        self.assertEqual(len(keys), 4)
+
+    def test_edited_post_is_rendered_again(self):
+        """После правки поста лента показывает новый текст."""
+        self.render()
+        self.post.text = 'Исправленный текст'
+        self.post.save()
+        self.assertIn('Исправленный текст', self.render())
+
+    def test_group_rename_touches_its_posts(self):
+        """Переименование сообщества сдвигает updated его постов."""
+        group = Group.objects.create(title='Старое', slug='group')
+        self.post.group = group
+        self.post.save()
+        self.render()
+        group.title = 'Новое'
+        group.save()
+        self.post.refresh_from_db()
+        self.post.comment_count = 0
+        self.assertIn('#Новое', self.render())
+
+    def test_new_group_does_not_touch_posts(self):
+        """Создание сообщества не обновляет посты: их у него ещё нет."""
+        with self.assertNumQueries(1):
+            Group.objects.create(title='Новое', slug='new')
+
+    def test_author_rename_is_rendered_again(self):
+        """Новое имя автора попадает в карточку, хотя пост не менялся."""
+        self.render()
+        self.author.username = 'renamed'
+        self.author.save()
+        self.assertIn('@renamed', self.render())
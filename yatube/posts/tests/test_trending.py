@@ -0,0 +1,102 @@
+import datetime as dt
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from posts import trending
+from posts.models import (
+    Comment, Follow, Group, Post, TrendingGroup, TrendingPost, User
+)
+
+HOUR = 60 * 60
+
+
+@override_settings(TRENDING_HALF_LIFE=HOUR, TRENDING_MIN_SCORE=0.1)
+class TrendingTests(TestCase):
+    def setUp(self):
+        self.author = User.objects.create_user(username='author')
+        self.group = Group.objects.create(title='Группа', slug='group')
+        self.posts = [
+            Post.objects.create(
+                text=f'Пост {i}', author=self.author, group=self.group
+            )
+            for i in range(3)
+        ]
+
+    def test_events_update_scores_incrementally(self):
+        """Новые посты, комментарии и подписчики поднимают счёт."""
+        old, _, newest = self.posts
+        self.assertAlmostEqual(
+            TrendingGroup.objects.get(pk=self.group.pk).score, 3, places=3
+        )
+        Comment.objects.create(post=old, author=self.author, text='1')
+        Comment.objects.create(post=old, author=self.author, text='2')
+        Follow.objects.create(
+            user=User.objects.create_user(username='fan'), author=self.author
+        )
+        self.assertAlmostEqual(
+            TrendingPost.objects.get(pk=old.pk).score, 3, places=3
+        )
+        self.assertAlmostEqual(
+            TrendingPost.objects.get(pk=newest.pk).score, 3, places=3
+        )
+
+    def test_rank_order_matches_decayed_score(self):
+        """Свежая активность обгоняет втрое большую, но на два периода
+        полураспада более старую."""
+        TrendingPost.objects.all().delete()
+        now = dt.datetime(2021, 1, 1, tzinfo=dt.timezone.utc)
+        first, second, _ = self.posts
+        trending.bump(TrendingPost, first.pk, 30, now - dt.timedelta(hours=2))
+        trending.bump(TrendingPost, second.pk, 10, now)
+        trending.bump(TrendingPost, first.pk, 1, now)
+        self.assertAlmostEqual(
+            TrendingPost.objects.get(pk=first.pk).score, 8.5, places=3
+        )
+        self.assertEqual(trending.top_posts(2), [second, first])
+
+    def test_compact_drops_faded_rows(self):
+        """Сжатие удаляет строки, затухшие ниже порога."""
+        later = Post.objects.first().updated + dt.timedelta(hours=4)
+        # Счёт поста 1/16 уже ниже порога, у сообщества 3/16 — ещё нет.
+        self.assertEqual(trending.compact(later), 3)
+        self.assertFalse(TrendingPost.objects.exists())
+        self.assertTrue(TrendingGroup.objects.exists())
+
+    def test_late_event_decays_to_row_moment(self):
+        """Событие из прошлого добавляется уже затухшим."""
+        row = TrendingPost.objects.get(pk=self.posts[0].pk)
+        trending.bump(
+            TrendingPost, row.pk, 4, row.updated - dt.timedelta(hours=2)
+        )
+        row.refresh_from_db()
+        self.assertAlmostEqual(row.score, 2, places=3)
+
+    def test_rebuild_matches_incremental_scores(self):
+        """Пересборка по данным даёт те же счета, что и сигналы."""
+        Comment.objects.create(
+            post=self.posts[0], author=self.author, text='x'
+        )
+        now = dt.datetime.now(dt.timezone.utc)
+        before = {
+            row.pk: trending.decayed(row.score, row.updated, now)
+            for row in TrendingPost.objects.all()
+        }
+        output = StringIO()
+        call_command('compact_trending', '--rebuild', stdout=output)
+        self.assertIn('после пересборки: 4', output.getvalue())
+        for row in TrendingPost.objects.all():
+            self.assertAlmostEqual(
+                trending.decayed(row.score, row.updated, now),
+                before[row.pk], places=3
+            )
+
+    def test_trending_page(self):
+        Comment.objects.create(
+            post=self.posts[0], author=self.author, text='x'
+        )
+        response = self.client.get(reverse('posts:trending'))
+        self.assertEqual(response.context['posts'][0], self.posts[0])
+        self.assertEqual(response.context['groups'], [self.group])
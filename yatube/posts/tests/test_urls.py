@@ -4,6 +4,7 @@ from django.urls import reverse
 from http import HTTPStatus
 
 from posts.models import Group, Post
+from users.forms import CreationForm
 
 User = get_user_model()
 
@@ -109,3 +110,15 @@ class PostsURLTests(TestCase):
         """Сервер возвращает код 404"""
         response = self.guest_client.get('/not_page_url/')
         self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+
+    def test_signup_rejects_reserved_usernames(self):
+        """Имя, занятое служебной страницей, при регистрации недоступно."""
+        for username, valid in (('search', False), ('trending', False),
+                                ('admin', False), ('reader', True)):
+            with self.subTest(username=username):
+                form = CreationForm({
+                    'username': username,
+                    'password1': 'Secret-pass-123',
+                    'password2': 'Secret-pass-123',
+                })
+                self.assertEqual(form.is_valid(), valid)
@@ -2,14 +2,21 @@ from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.core.cache import cache
 from django.core.files.uploadedfile import SimpleUploadedFile
-from django.test import Client, TestCase
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django import forms
 
+from http import HTTPStatus
+import json
 import shutil
 import tempfile
+from unittest import mock
 
-from posts.models import Comment, Follow, Group, Post
+from posts import export as exports
+from posts import thumbnails
+from posts.models import Comment, Follow, Group, Post, TimelineEntry
 
 User = get_user_model()
 
@@ -210,21 +217,60 @@ class PostPageTests(TestCase):
             'Картинка поста на странице поста не отображается'
         ))
 
+    def test_feed_does_not_build_thumbnails(self):
+        """Лента не строит миниатюры в запросе, а показывает заглушку"""
+        cache.clear()
+        with mock.patch(
+            'sorl.thumbnail.base.ThumbnailBackend._create_thumbnail'
+        ) as create_thumbnail:
+            response = self.authorized_client.get(reverse('posts:index'))
+        create_thumbnail.assert_not_called()
+        self.assertContains(response, 'card-img bg-light')
+
+    def test_feed_shows_built_thumbnail(self):
+        """Готовая миниатюра берётся из поста, без хранилища ключей sorl"""
+        # Картинку sorl в тесте не обрабатывает, проверяется только запись
+        # имени готовой миниатюры.
+        thumbnail = mock.Mock()
+        thumbnail.name = name = 'cache/ab/cd/card.jpg'
+        with mock.patch(
+            'posts.thumbnails.get_thumbnail', return_value=thumbnail
+        ):
+            thumbnails.generate(self.post.image.name)
+        self.assertEqual(Post.objects.get(pk=self.post.pk).thumbnail, name)
+        cache.clear()
+        with mock.patch(
+            'sorl.thumbnail.kvstores.base.KVStoreBase.get'
+        ) as kvstore_get:
+            response = self.authorized_client.get(reverse('posts:index'))
+        kvstore_get.assert_not_called()
+        self.assertContains(response, f'src="{settings.MEDIA_URL}{name}"')
+
     def test_cache(self):
         """Тестирование работы кэша"""
+        cache.clear()
         response_before = self.authorized_client.get(reverse('posts:index'))
-        post = Post.objects.create(text='test', author=self.user)
+        response_cached = self.authorized_client.get(reverse('posts:index'))
+        self.assertEqual(response_before.content, response_cached.content)
+        post = Post.objects.create(text='test_cache_post', author=self.user)
         response_after = self.authorized_client.get(reverse('posts:index'))
+        self.assertContains(response_after, post.text)
         Post.objects.filter(id=post.id).delete()
         response_after_delete = self.authorized_client.get(
             reverse('posts:index'))
-        self.assertEqual(response_after.content, response_after_delete.content)
-        cache.clear()
-        response_after_clear = self.authorized_client.get(
-            reverse('posts:index'))
+        self.assertNotContains(response_after_delete, post.text)
         self.assertEqual(
-            response_after_clear.context['paginator'].count,
-            response_before.context['paginator'].count)
+            response_before.content, response_after_delete.content)
+
+    def test_cache_varies_on_page(self):
+        """Кэш главной страницы различает страницы ленты"""
+        for i in range(settings.POSTS_PAGINATOR):
+            Post.objects.create(text=f'test_page_post_{i}', author=self.user)
+        first = self.authorized_client.get(reverse('posts:index'))
+        second = self.authorized_client.get(
+            reverse('posts:index') + '?page=2')
+        self.assertNotContains(first, self.post.text)
+        self.assertContains(second, self.post.text)
 
 
 class PaginatorViewsTest(TestCase):
@@ -284,6 +330,54 @@ class PaginatorViewsTest(TestCase):
         self.assertEqual(len(response.context['page'].object_list), 3)
 
 
+class CursorPaginatorViewsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create(username='test_user')
+        cls.group = Group.objects.create(
+            title='test_group',
+            slug='test-slug',
+            description='test_desc'
+        )
+        for i in range(13):
+            Post.objects.create(
+                text=f'{i} text',
+                author=cls.user,
+                group=cls.group
+            )
+
+    def test_cursor_pages_cover_feed(self):
+        """Курсорные страницы проходят всю ленту без пропусков."""
+        urls = (
+            reverse('posts:index'),
+            reverse('posts:group_posts', kwargs={'slug': self.group.slug}),
+            reverse('posts:profile', kwargs={'username': self.user.username}),
+        )
+        expected = list(Post.objects.order_by('-pub_date', '-id'))
+        for url in urls:
+            with self.subTest(url=url):
+                first = self.client.get(url + '?cursor=').context['page']
+                self.assertEqual(list(first), expected[:10])
+                self.assertFalse(first.has_previous())
+                second = self.client.get(
+                    url, {'cursor': first.next_cursor}
+                ).context['page']
+                self.assertEqual(list(second), expected[10:])
+                self.assertFalse(second.has_next())
+                back = self.client.get(
+                    url, {'cursor': second.previous_cursor}
+                ).context['page']
+                self.assertEqual(list(back), expected[:10])
+                self.assertFalse(back.has_previous())
+
+    def test_broken_cursor_returns_first_page(self):
+        """Повреждённый курсор отдаёт первую страницу."""
+        response = self.client.get(reverse('posts:index'), {'cursor': 'x'})
+        self.assertEqual(len(response.context['page']), 10)
+        self.assertContains(response, '?cursor=')
+
+
 class TestComment(TestCase):
     @classmethod
     def setUpClass(cls):
@@ -327,6 +421,63 @@ class TestComment(TestCase):
                 post_id=TestComment.post.id).exists())
 
 
+@override_settings(COMMENTS_PAGINATOR=3)
+class CommentPageTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='author')
+        cls.post = Post.objects.create(text='Вирусный пост', author=cls.user)
+        for i in range(7):
+            Comment.objects.create(
+                post=cls.post, author=cls.user, text=f'comment {i}'
+            )
+        cls.kwargs = {'username': cls.user.username, 'post_id': cls.post.pk}
+
+    def test_post_page_renders_first_comments(self):
+        """На странице поста только первая страница комментариев."""
+        response = self.client.get(reverse('posts:post', kwargs=self.kwargs))
+        comments = response.context['comments']
+        self.assertEqual(
+            [comment.text for comment in comments],
+            ['comment 6', 'comment 5', 'comment 4']
+        )
+        self.assertEqual(response.context['post'].comment_count, 7)
+        self.assertContains(response, 'js-more-comments')
+
+    def test_load_more_walks_all_comments(self):
+        """Догрузка по курсору отдаёт остальные комментарии по порядку."""
+        url = reverse('posts:comments', kwargs=self.kwargs)
+        texts, cursor = [], None
+        while True:
+            params = {'format': 'json'}
+            if cursor:
+                params['cursor'] = cursor
+            data = self.client.get(url, params).json()
+            texts += [comment['text'] for comment in data['comments']]
+            cursor = data['next_cursor']
+            if cursor is None:
+                break
+        self.assertEqual(texts, [f'comment {i}' for i in range(6, -1, -1)])
+
+    def test_load_more_fragment(self):
+        """Без format=json догрузка отдаёт HTML-фрагмент без шаблона base."""
+        response = self.client.get(
+            reverse('posts:comments', kwargs=self.kwargs)
+        )
+        self.assertTemplateUsed(response, 'includes/comment_list.html')
+        self.assertTemplateNotUsed(response, 'base.html')
+        self.assertContains(response, 'comment 6')
+
+    def test_comments_of_other_author_not_found(self):
+        """Комментарии поста с чужим автором в адресе не отдаются."""
+        other = User.objects.create_user(username='other')
+        response = self.client.get(reverse('posts:comments', kwargs={
+            'username': other.username, 'post_id': self.post.pk
+        }))
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+
+
 class TestFollow(TestCase):
     @classmethod
     def setUpClass(cls):
@@ -377,3 +528,240 @@ class TestFollow(TestCase):
         self.authorized_client.force_login(user_not_follower)
         response = self.authorized_client.get(reverse('posts:follow_index'))
         self.assertNotContains(response, TestFollow.post.text)
+
+    def test_follow_feed_materialized(self):
+        """Лента подписок заполняется при подписке и публикации."""
+        Follow.objects.create(
+            user=TestFollow.user_follower,
+            author=TestFollow.user_following
+        )
+        new_post = Post.objects.create(
+            text='after_follow',
+            author=TestFollow.user_following
+        )
+        response = self.authorized_client.get(reverse('posts:follow_index'))
+        self.assertEqual(
+            list(response.context['page']), [new_post, TestFollow.post]
+        )
+        Follow.objects.filter(user=TestFollow.user_follower).delete()
+        self.assertFalse(
+            TimelineEntry.objects.filter(
+                user=TestFollow.user_follower
+            ).exists()
+        )
+
+
+class SearchViewTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username='test_user')
+        self.match = Post.objects.create(
+            text='Сегодня тестировали новые проекты',
+            author=self.user
+        )
+        self.other = Post.objects.create(text='Про котов', author=self.user)
+
+    def test_search_matches_word_forms(self):
+        """Поиск находит посты по другим формам слова."""
+        response = self.client.get(reverse('posts:search'), {'q': 'проект'})
+        self.assertEqual(list(response.context['page']), [self.match])
+
+    def test_search_index_follows_edits(self):
+        """Индекс обновляется при изменении и удалении поста."""
+        self.other.text = 'Теперь про проекты'
+        self.other.save()
+        response = self.client.get(reverse('posts:search'), {'q': 'проекту'})
+        self.assertEqual(len(response.context['page']), 2)
+        self.match.delete()
+        response = self.client.get(reverse('posts:search'), {'q': 'проекту'})
+        self.assertEqual(list(response.context['page']), [self.other])
+
+    def test_search_cursor_pagination(self):
+        """Результаты поиска листаются курсором."""
+        for i in range(settings.POSTS_PAGINATOR):
+            Post.objects.create(text=f'проект {i}', author=self.user)
+        first = self.client.get(
+            reverse('posts:search'), {'q': 'проект'}
+        ).context['page']
+        second = self.client.get(
+            reverse('posts:search'),
+            {'q': 'проект', 'cursor': first.next_cursor}
+        ).context['page']
+        self.assertEqual(len(first), settings.POSTS_PAGINATOR)
+        self.assertEqual(len(second), 1)
+        self.assertFalse(set(first) & set(second))
+
+    def test_search_without_index_matches_substring(self):
+        """Без FTS5 поиск находит посты по подстроке."""
+        with mock.patch('posts.search.is_available', return_value=False):
+            response = self.client.get(
+                reverse('posts:search'), {'q': 'котов'}
+            )
+        self.assertEqual(list(response.context['page']), [self.other])
+
+
+class ExportViewTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.staff = User.objects.create(username='staff', is_staff=True)
+        cls.author = User.objects.create(username='author')
+        cls.other = User.objects.create(username='other')
+        for i in range(3):
+            Post.objects.create(text=f'post {i}', author=cls.author)
+        Post.objects.create(text='other post', author=cls.other)
+
+    def export(self, client, **params):
+        response = client.get(
+            reverse('posts:export', kwargs={'model': 'posts'}), params
+        )
+        content = b''.join(response.streaming_content).decode()
+        return response, content
+
+    def test_export_streams_filtered_jsonl(self):
+        """Выгрузка отдаёт JSONL потоком с фильтром по автору."""
+        self.client.force_login(self.staff)
+        response, content = self.export(self.client, author='author')
+        self.assertTrue(response.streaming)
+        records = [json.loads(line) for line in content.splitlines()]
+        self.assertEqual(len(records), 3)
+        self.assertEqual({record['author'] for record in records}, {'author'})
+
+    def test_export_csv(self):
+        """Выгрузка в CSV начинается с заголовка."""
+        self.client.force_login(self.staff)
+        response, content = self.export(self.client, format='csv')
+        rows = content.splitlines()
+        self.assertEqual(rows[0], 'id,author,group,text,pub_date,image')
+        self.assertEqual(len(rows), 5)
+
+    def test_export_chunks_do_not_depend_on_column_order(self):
+        """Пачки выгрузки идут по pk, даже если id не первая колонка."""
+        export = exports.Export(Post, {'text': 'text', 'id': 'id'})
+        with mock.patch.dict(exports.EXPORTS, {'texts': export}):
+            rows = list(exports.rows('texts', chunk_size=2))
+        self.assertEqual(
+            rows, list(Post.objects.order_by('pk').values_list('text', 'id'))
+        )
+
+    def test_export_only_for_staff(self):
+        """Выгрузка недоступна обычным пользователям."""
+        self.client.force_login(self.author)
+        response = self.client.get(
+            reverse('posts:export', kwargs={'model': 'posts'})
+        )
+        self.assertEqual(response.status_code, HTTPStatus.FOUND)
+
+
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username='author')
+        self.reader = User.objects.create_user(username='reader')
+        self.group = Group.objects.create(
+            title='Группа', slug='group', description='Описание'
+        )
+        self.post = Post.objects.create(
+            text='Пост', author=self.author, group=self.group
+        )
+        self.urls = [
+            reverse('posts:index'),
+            reverse('posts:group_posts', kwargs={'slug': 'group'}),
+            reverse('posts:profile', kwargs={'username': 'author'}),
+            reverse('posts:post', kwargs={
+                'username': 'author', 'post_id': self.post.pk
+            }),
+        ]
+
+    def test_unchanged_page_not_modified(self):
+        """Повторный запрос с тем же ETag получает 304 без выборки постов."""
+        for url in self.urls:
+            with self.subTest(url=url):
+                etag = self.client.get(url)['ETag']
+                with CaptureQueriesContext(connection) as queries:
+                    response = self.client.get(
+                        url, HTTP_IF_NONE_MATCH=etag
+                    )
+                self.assertEqual(
+                    response.status_code, HTTPStatus.NOT_MODIFIED
+                )
+                self.assertFalse(any(
+                    'posts_post' in query['sql'] for query in queries
+                ))
+
+    def test_changes_invalidate_etag(self):
+        """Новый комментарий меняет ETag всех страниц."""
+        etags = [self.client.get(url)['ETag'] for url in self.urls]
+        Comment.objects.create(
+            post=self.post, author=self.reader, text='Комментарий'
+        )
+        for url, etag in zip(self.urls, etags):
+            with self.subTest(url=url):
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, HTTPStatus.OK)
+
+    def test_etag_depends_on_viewer_and_followers(self):
+        """ETag профиля зависит от зрителя и числа подписчиков автора."""
+        url = self.urls[2]
+        etag = self.client.get(url)['ETag']
+        self.client.force_login(self.reader)
+        self.assertNotEqual(self.client.get(url)['ETag'], etag)
+        etag = self.client.get(url)['ETag']
+        other = User.objects.create_user(username='other')
+        Follow.objects.create(user=other, author=self.author)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+
+    def test_new_csrf_token_invalidates_post_page(self):
+        """Страница поста с формой не отдаёт 304 со старым CSRF-токеном."""
+        url = self.urls[3]
+        self.client.force_login(self.reader)
+        self.client.get(url)
+        etag = self.client.get(url)['ETag']
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, HTTPStatus.NOT_MODIFIED)
+        self.client.cookies[settings.CSRF_COOKIE_NAME] = 'x' * 64
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+
+
+class FeedCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='reader')
+        for i in range(3):
+            Post.objects.create(text=f'post {i}', author=cls.user)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_cached_feed_skips_database(self):
+        """Попадание в кэш ленты не выполняет ни одного запроса."""
+        first = self.client.get(reverse('posts:index'))
+        with self.assertNumQueries(0):
+            second = self.client.get(reverse('posts:index'))
+        self.assertEqual(first.content, second.content)
+
+    def test_anonymous_visitors_share_an_entry(self):
+        """Анонимы делят одну запись, авторизованные — свою."""
+        self.client.get(reverse('posts:index'))
+        keys = len(cache._cache)
+        Client().get(reverse('posts:index'))
+        self.assertEqual(len(cache._cache), keys)
+        client = Client()
+        client.force_login(self.user)
+        client.get(reverse('posts:index'))
+        self.assertGreater(len(cache._cache), keys)
+
+    def test_author_rename_rebuilds_feed(self):
+        """Смена имени автора сбрасывает закэшированные ленты."""
+        self.client.get(reverse('posts:index'))
+        self.user.username = 'renamed'
+        self.user.save()
+        self.assertContains(self.client.get(reverse('posts:index')), 'renamed')
+
+    def test_login_keeps_feed(self):
+        """Запись ``last_login`` при входе не сбрасывает ленты."""
+        self.client.get(reverse('posts:index'))
+        self.user.save(update_fields=['last_login'])
+        with self.assertNumQueries(0):
+            self.client.get(reverse('posts:index'))
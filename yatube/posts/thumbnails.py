@@ -0,0 +1,84 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+from sorl.thumbnail import default, get_thumbnail
+from sorl.thumbnail.images import ImageFile
+
+from .cache import bump_version
+from .models import Post
+
+logger = logging.getLogger(__name__)
+
+# Геометрии миниатюр, которые используют шаблоны ленты. Имя миниатюры
+# ``card`` запоминается в ``Post.thumbnail``.
+GEOMETRIES = {
+    'card': ('960x339', {'crop': 'center', 'upscale': True}),
+}
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.POSTS_THUMBNAIL_WORKERS,
+                thread_name_prefix='thumbnails'
+            )
+    return _executor
+
+
+def generate(name):
+    """Строит все миниатюры картинки ``name`` из ``GEOMETRIES``."""
+    try:
+        built = {
+            alias: get_thumbnail(name, geometry, **options)
+            for alias, (geometry, options) in GEOMETRIES.items()
+        }
+    except Exception:
+        logger.exception('Не удалось построить миниатюры для %s', name)
+    else:
+        # Закэшированные ленты и карточки могли сохранить заглушку
+        # вместо картинки.
+        Post.objects.filter(image=name).update(
+            thumbnail=built['card'].name, updated=timezone.now()
+        )
+        bump_version('posts')
+
+
+def _generate_in_worker(name):
+    try:
+        generate(name)
+    finally:
+        # Соединение с БД (хранилище ключей sorl) принадлежит потоку пула.
+        connection.close()
+
+
+def schedule(image):
+    """Ставит построение миниатюр в фоновый пул после коммита транзакции."""
+    if not image:
+        return
+    name = image.name
+    if not settings.POSTS_THUMBNAIL_WORKERS:
+        transaction.on_commit(lambda: generate(name))
+        return
+    transaction.on_commit(
+        lambda: _get_executor().submit(_generate_in_worker, name)
+    )
+
+
+def get_ready(post):
+    """Готовая миниатюра карточки или ``None``, если её ещё не построили.
+
+    Читает только поле поста: ни хранилища ключей sorl, ни обработки
+    картинки в запросе.
+    """
+    if not post.image or not post.thumbnail:
+        return None
+    return ImageFile(post.thumbnail, default.storage)
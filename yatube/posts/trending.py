@@ -0,0 +1,126 @@
+import math
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Comment, Post, TrendingGroup, TrendingPost
+
+
+def _rank(score, moment):
+    return math.log2(score) + moment.timestamp() / settings.TRENDING_HALF_LIFE
+
+
+def decayed(score, updated, now):
+    """Счёт ``score`` на момент ``updated``, затухший к моменту ``now``."""
+    age = (now - updated).total_seconds()
+    return score * 2 ** (-age / settings.TRENDING_HALF_LIFE)
+
+
+def bump(model, pk, weight, now=None):
+    """Затухает счёт строки до момента события ``now`` и добавляет
+    ``weight``."""
+    now = now or timezone.now()
+    with transaction.atomic():
+        row, created = model.objects.select_for_update().get_or_create(
+            pk=pk, defaults={'score': weight, 'updated': now,
+                             'rank': _rank(weight, now)}
+        )
+        if created:
+            return row
+        if now < row.updated:
+            # Запоздавшее событие затухает до момента строки.
+            row.score += decayed(weight, now, row.updated)
+        else:
+            row.score = decayed(row.score, row.updated, now) + weight
+            row.updated = now
+        row.rank = _rank(row.score, row.updated)
+        row.save(update_fields=('score', 'updated', 'rank'))
+    return row
+
+
+def post_added(post):
+    weight = settings.TRENDING_WEIGHTS['post']
+    bump(TrendingPost, post.pk, weight, post.pub_date)
+    if post.group_id:
+        bump(TrendingGroup, post.group_id, weight, post.pub_date)
+
+
+def comment_added(comment):
+    weight = settings.TRENDING_WEIGHTS['comment']
+    bump(TrendingPost, comment.post_id, weight, comment.created)
+    group_id = comment.post.group_id
+    if group_id:
+        bump(TrendingGroup, group_id, weight, comment.created)
+
+
+def followed(author_id):
+    """Новый подписчик поднимает последний пост автора."""
+    post_id = Post.objects.filter(author=author_id).values_list(
+        'pk', flat=True
+    ).first()
+    if post_id is not None:
+        bump(TrendingPost, post_id, settings.TRENDING_WEIGHTS['follow'])
+
+
+def compact(now=None):
+    """Удаляет строки, чей счёт затух ниже ``TRENDING_MIN_SCORE``.
+
+    Порог по счёту — это порог по ``rank``, поэтому каждая таблица чистится
+    одним DELETE по индексу. Возвращает число удалённых строк.
+    """
+    threshold = _rank(settings.TRENDING_MIN_SCORE, now or timezone.now())
+    return sum(
+        model.objects.filter(rank__lt=threshold).delete()[0]
+        for model in (TrendingPost, TrendingGroup)
+    )
+
+
+def rebuild(now=None):
+    """Пересобирает счета по постам и комментариям последних
+    ``TRENDING_WINDOW`` секунд; подписки без даты не учитываются."""
+    now = now or timezone.now()
+    since = now - timedelta(seconds=settings.TRENDING_WINDOW)
+    posts = defaultdict(float)
+    groups = defaultdict(float)
+    events = (
+        ('post', Post.objects.filter(pub_date__gte=since).values_list(
+            'pk', 'group_id', 'pub_date'
+        )),
+        ('comment', Comment.objects.filter(created__gte=since).values_list(
+            'post_id', 'post__group_id', 'created'
+        )),
+    )
+    for kind, rows in events:
+        weight = settings.TRENDING_WEIGHTS[kind]
+        for post_id, group_id, moment in rows.iterator():
+            score = decayed(weight, moment, now)
+            posts[post_id] += score
+            if group_id:
+                groups[group_id] += score
+    with transaction.atomic():
+        for model, scores in ((TrendingPost, posts), (TrendingGroup, groups)):
+            model.objects.all().delete()
+            model.objects.bulk_create(
+                model(pk=pk, score=score, updated=now, rank=_rank(score, now))
+                for pk, score in scores.items()
+            )
+    return len(posts) + len(groups)
+
+
+def top_posts(limit):
+    return [
+        row.post for row in TrendingPost.objects.select_related(
+            'post__author', 'post__group'
+        ).order_by('-rank')[:limit]
+    ]
+
+
+def top_groups(limit):
+    return [
+        row.group for row in TrendingGroup.objects.select_related(
+            'group'
+        ).order_by('-rank')[:limit]
+    ]
@@ -12,15 +12,33 @@ urlpatterns = [
     path('group/<slug:slug>/', views.group_posts, name='group_posts'),
     path('new/', views.new_post, name='new_post'),
     path('follow/', views.follow_index, name='follow_index'),
+    path('search/', views.search, name='search'),
+    path('trending/', views.trending_posts, name='trending'),
+    path('export/<str:model>/', views.export, name='export'),
     path('<str:username>/', views.profile, name='profile'),
     path('<str:username>/<int:post_id>/', views.post_view, name='post'),
     path('<str:username>/<int:post_id>/edit/', views.post_edit, name='edit'),
+    path(
+        '<str:username>/<int:post_id>/comments/',
+        views.post_comments,
+        name='comments'
+    ),
     path(
         '<str:username>/<int:post_id>/comment/',
         views.add_comment,
         name='add_comment'
     ),
 
+    path(
+        '<str:username>/followers/',
+        views.followers,
+        name='followers'
+    ),
+    path(
+        '<str:username>/following/',
+        views.following,
+        name='following'
+    ),
     path(
         '<str:username>/follow/',
         views.profile_follow,
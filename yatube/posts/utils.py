@@ -0,0 +1,68 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count
+from django.template.loader import render_to_string
+from django.utils.functional import SimpleLazyObject
+from django.utils.safestring import mark_safe
+
+from .cache import version_timeout
+from .models import Comment
+from .paginators import CursorPaginator
+
+COMMENT_ORDERING = ('-created', '-id')
+FEED_KEY = 'posts:feed:{name}:{hash}'
+FEED_TEMPLATE = 'includes/feed.html'
+
+
+def attach_comment_counts(posts):
+    """Проставляет постам ``comment_count`` одним агрегирующим запросом."""
+    posts = list(posts)
+    counts = dict(
+        Comment.objects.filter(post__in=posts)
+        .order_by()
+        .values_list('post')
+        .annotate(Count('pk'))
+    )
+    for post in posts:
+        post.comment_count = counts.get(post.pk, 0)
+    return posts
+
+
+def comment_page(post_id, cursor=None):
+    """Страница комментариев поста, от новых к старым, по курсору."""
+    comments = Comment.objects.filter(post_id=post_id).select_related(
+        'author'
+    )
+    paginator = CursorPaginator(
+        comments, settings.COMMENTS_PAGINATOR, COMMENT_ORDERING
+    )
+    return paginator.get_page(cursor)
+
+
+def cached_feed(request, name, versions, build_page):
+    """HTML страницы ленты вместе с пагинатором и сама страница.
+
+    Ключ собирается из версий данных, номера страницы или курсора
+    и зрителя, и при попадании не выполняется ни пагинация, ни запросы
+    постов: страница возвращается ленивой и строится, только если к ней
+    обратятся вне кэшированного HTML. Авторизованным карточки
+    показывают ссылку на правку своих постов, поэтому их записи отдельные;
+    анонимы делят одну запись на страницу.
+    """
+    viewer = request.user.pk if request.user.is_authenticated else 'anon'
+    raw = ':'.join(str(part) for part in (
+        *versions, request.GET.get('page', ''),
+        request.GET.get('cursor', ''), viewer
+    ))
+    key = FEED_KEY.format(
+        name=name, hash=hashlib.md5(raw.encode()).hexdigest()
+    )
+    html = cache.get(key)
+    if html is not None:
+        return mark_safe(html), SimpleLazyObject(build_page)
+    page = build_page()
+    html = render_to_string(FEED_TEMPLATE, {'page': page}, request)
+    cache.set(key, html, version_timeout())
+    return html, page
@@ -1,74 +1,174 @@
+from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.decorators import login_required
-from django.core.paginator import Paginator
+from django.http import (
+    Http404, HttpResponseBadRequest, JsonResponse, StreamingHttpResponse
+)
 from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse
+from django.views.decorators.http import condition
 
+from . import export as exports
+from . import counters, follows, recommendations, trending
+from .cache import get_version
+from .conditional import author_etag, feed_etag, post_etag
 from .forms import CommentForm, PostForm
-from .models import Group, Follow, Post, User
-from yatube.settings import POSTS_PAGINATOR
+from .models import Follow, Group, Post, TimelineEntry, User
+from .paginators import CursorPage, CursorPaginator, paginate
+from .search import can_rank, ranked_ids
+from .stats import get_stats
+from .thumbnails import schedule as schedule_thumbnails
+from .utils import attach_comment_counts, cached_feed, comment_page
 
 
+@condition(etag_func=feed_etag)
 def index(request):
-    post_list = Post.objects.select_related('group').all()
-    paginator = Paginator(post_list, POSTS_PAGINATOR)
-    page_number = request.GET.get('page')
-    page = paginator.get_page(page_number)
-    context = {'page': page, 'paginator': paginator}
-    return render(request, 'index.html', context)
+    def build_page():
+        post_list = Post.objects.select_related('author', 'group').all()
+        page = paginate(request, post_list)
+        page.object_list = attach_comment_counts(page.object_list)
+        return page
+
+    feed, page = cached_feed(
+        request, 'index', (get_version('posts'),), build_page
+    )
+    return render(request, 'index.html', {'feed': feed, 'page': page})
 
 
+@condition(etag_func=feed_etag)
 def group_posts(request, slug):
     group = get_object_or_404(Group, slug=slug)
-    posts = group.posts.all()
-    paginator = Paginator(posts, POSTS_PAGINATOR)
-    page_number = request.GET.get('page')
-    page = paginator.get_page(page_number)
-    context = {'group': group, 'page': page, 'paginator': paginator}
+    posts = group.posts.select_related('author', 'group')
+    page = paginate(request, posts)
+    page.object_list = attach_comment_counts(page.object_list)
+    context = {'group': group, 'page': page, 'paginator': page.paginator}
     return render(request, 'group.html', context)
 
 
+@condition(etag_func=author_etag)
 def profile(request, username):
-    author = get_object_or_404(User, username=username)
-    post_list = author.posts.all()
-    paginator = Paginator(post_list, POSTS_PAGINATOR)
-    page_number = request.GET.get('page')
-    page = paginator.get_page(page_number)
-    following = Follow.objects.filter(
-        user=request.user.id,
-        author=author.id
+    author = get_object_or_404(
+        User.objects.select_related('stats'),
+        username=username
     )
+    post_list = author.posts.select_related('author', 'group')
+    page = paginate(request, post_list)
+    page.object_list = attach_comment_counts(page.object_list)
     context = {
         'author': author,
         'page': page,
-        'paginator': paginator,
-        'following': following
+        'paginator': page.paginator,
+        'following': follows.is_following(request.user.pk, author.pk),
+        'recommended': recommendations.for_user(
+            request.user, exclude={author.pk}
+        ),
+        'stats': get_stats(author)
     }
     return render(request, 'profile.html', context)
 
 
+@counters.counts_views
+@condition(etag_func=post_etag)
 def post_view(request, username, post_id):
-    post = get_object_or_404(Post, pk=post_id, author__username=username)
+    post = get_object_or_404(
+        Post.objects.select_related('author__stats', 'group'),
+        pk=post_id,
+        author__username=username
+    )
     author = post.author
     form = CommentForm(instance=None)
-    comments = post.comments.all()
+    attach_comment_counts([post])
     context = {
         'author': author,
         'post': post,
         'form': form,
-        'comments': comments
+        'comments': comment_page(post.pk),
+        'views': counters.views(post),
+        'following': follows.is_following(request.user.pk, author.pk),
+        'stats': get_stats(author)
     }
     return render(request, 'post.html', context)
 
 
+def post_comments(request, username, post_id):
+    post = get_object_or_404(
+        Post.objects.select_related('author'),
+        pk=post_id,
+        author__username=username
+    )
+    comments = comment_page(post.pk, request.GET.get('cursor'))
+    if request.GET.get('format') == 'json':
+        return JsonResponse({
+            'comments': [
+                {
+                    'id': comment.pk,
+                    'author': comment.author.username,
+                    'text': comment.text,
+                    'created': comment.created.isoformat(),
+                }
+                for comment in comments
+            ],
+            'next_cursor': comments.next_cursor,
+        })
+    return render(
+        request,
+        'includes/comment_list.html',
+        {'post': post, 'comments': comments}
+    )
+
+
+def trending_posts(request):
+    """Посты и сообщества с наибольшей затухающей активностью.
+
+    Строки трендов обновляются сигналами при каждом событии, а порядок
+    по ``rank`` не зависит от момента чтения, поэтому страница — это
+    чтение верхушки двух таблиц по индексу.
+    """
+    posts = attach_comment_counts(
+        trending.top_posts(settings.POSTS_PAGINATOR)
+    )
+    context = {
+        'posts': posts,
+        'groups': trending.top_groups(settings.TRENDING_GROUPS_SHOWN),
+    }
+    return render(request, 'trending.html', context)
+
+
+def search(request):
+    query = request.GET.get('q', '').strip()
+    cursor = request.GET.get('cursor')
+    posts = Post.objects.select_related('author', 'group')
+    if not query:
+        page = CursorPage([], None)
+    elif can_rank(query):
+        ids, next_cursor = ranked_ids(
+            'post', query, cursor, settings.POSTS_PAGINATOR
+        )
+        found = posts.in_bulk(ids)
+        page = CursorPage(
+            attach_comment_counts(found[pk] for pk in ids if pk in found),
+            None,
+            next_cursor=next_cursor
+        )
+    else:
+        # Без полнотекстового индекса — подстрока, свежие посты первыми.
+        page = CursorPaginator(
+            posts.filter(text__icontains=query), settings.POSTS_PAGINATOR
+        ).get_page(cursor)
+        page.object_list = attach_comment_counts(page.object_list)
+    return render(request, 'search.html', {'page': page, 'query': query})
+
+
 @login_required()
 def new_post(request):
-    form = PostForm(request.POST or None)
+    form = PostForm(request.POST or None, files=request.FILES or None)
     if not form.is_valid():
         return render(request, 'new_post.html',
                       {'form': form})
     post = form.save(commit=False)
     post.author = request.user
     post.save()
+    schedule_thumbnails(post.image)
     return redirect(reverse('posts:index'))
 
 
@@ -88,7 +188,13 @@ def post_edit(request, username, post_id):
             'form': form
         }
         return render(request, 'new_post.html', context)
-    form.save()
+    post = form.save(commit=False)
+    if 'image' in form.changed_data:
+        # Миниатюра старой картинки новой не подходит.
+        post.thumbnail = ''
+    post.save()
+    if 'image' in form.changed_data:
+        schedule_thumbnails(post.image)
     return redirect(reverse(
         'posts:post',
         kwargs={'username': post.author.username, 'post_id': post.pk}
@@ -107,7 +213,7 @@ def add_comment(request, username, post_id):
         return redirect(
             'posts:post',
             post_id=post.pk,
-            username=post.author.username
+            username=username
         )
     return render(
         request,
@@ -119,31 +225,114 @@ def add_comment(request, username, post_id):
 @login_required
 def follow_index(request):
     # информация о текущем пользователе доступна в переменной request.user.
-    posts = Post.objects.filter(author__following__user=request.user)
-    paginator = Paginator(posts, POSTS_PAGINATOR)
-    page_number = request.GET.get('page')
-    page = paginator.get_page(page_number)
-    return render(request, 'follow.html', {'page': page})
+    def build_page():
+        entries = TimelineEntry.objects.filter(
+            user=request.user
+        ).select_related('post__author', 'post__group')
+        page = paginate(request, entries, ordering=('-pub_date', '-post_id'))
+        page.object_list = attach_comment_counts(
+            entry.post for entry in page.object_list
+        )
+        return page
+
+    feed, page = cached_feed(
+        request, 'follow',
+        (get_version('posts'), get_version(f'follows:{request.user.pk}')),
+        build_page
+    )
+    context = {
+        'feed': feed,
+        'page': page,
+        'recommended': recommendations.for_user(request.user)
+    }
+    return render(request, 'follow.html', context)
+
+
+def people_page(request, username, relation):
+    """Страница подписчиков (``relation='user'``) или подписок
+    (``relation='author'``) автора.
+
+    Строки ``Follow`` листаются курсором по ``id`` без ``COUNT`` и
+    ``OFFSET``, а подписан ли зритель на каждого из показанных людей,
+    решается одним чтением графа подписок.
+    """
+    author = get_object_or_404(
+        User.objects.select_related('stats'), username=username
+    )
+    owner = 'author' if relation == 'user' else 'user'
+    rows = Follow.objects.filter(**{owner: author}).select_related(relation)
+    page = CursorPaginator(
+        rows, settings.FOLLOW_LIST_PAGINATOR, ('-id',)
+    ).get_page(request.GET.get('cursor'))
+    people = [getattr(row, relation) for row in page]
+    followed = follows.following_many(
+        request.user.pk, [person.pk for person in people]
+    )
+    for person in people:
+        person.viewer_follows = person.pk in followed
+    return {
+        'author': author,
+        'stats': get_stats(author),
+        'following': follows.is_following(request.user.pk, author.pk),
+        'people': people,
+        'page': page,
+    }
+
+
+def followers(request, username):
+    context = people_page(request, username, 'user')
+    context['title'] = 'Подписчики'
+    return render(request, 'follow_list.html', context)
+
+
+def following(request, username):
+    context = people_page(request, username, 'author')
+    context['title'] = 'Подписки'
+    return render(request, 'follow_list.html', context)
 
 
 @login_required
 def profile_follow(request, username):
-    author = get_object_or_404(User, username=username)
-    user = request.user
-    if author == user:
+    author = get_object_or_404(User.objects.only('id'), username=username)
+    if author == request.user:
         return redirect('posts:index')
-    Follow.objects.get_or_create(user=user, author=author)
+    follows.follow(request.user, author)
     return redirect('posts:profile', username=username)
 
 
 @login_required
 def profile_unfollow(request, username):
-    author = get_object_or_404(User, username=username)
-    follow = get_object_or_404(Follow, author=author.id, user=request.user.id)
-    follow.delete()
+    author = get_object_or_404(User.objects.only('id'), username=username)
+    follows.unfollow(request.user, author)
     return redirect('posts:profile', username=username)
 
 
+@staff_member_required
+def export(request, model):
+    fmt = request.GET.get('format', 'jsonl')
+    if model not in exports.EXPORTS or fmt not in exports.FORMATS:
+        raise Http404
+    try:
+        filters = {
+            'since': exports.parse_moment(request.GET.get('since')),
+            'until': exports.parse_moment(request.GET.get('until')),
+            'author': request.GET.get('author'),
+        }
+    except ValueError as error:
+        return HttpResponseBadRequest(str(error))
+    content_type = (
+        'text/csv' if fmt == 'csv' else 'application/x-ndjson'
+    )
+    response = StreamingHttpResponse(
+        exports.lines(model, fmt, **filters),
+        content_type=f'{content_type}; charset=utf-8'
+    )
+    response['Content-Disposition'] = (
+        f'attachment; filename="{model}.{fmt}"'
+    )
+    return response
+
+
 def page_not_found(request, exception=None):
     return render(
         request,
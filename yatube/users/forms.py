@@ -1,5 +1,7 @@
+from django import forms
 from django.contrib.auth.forms import UserCreationForm
 from django.contrib.auth import get_user_model
+from django.urls import resolve, reverse
 
 
 User = get_user_model()
@@ -9,3 +11,12 @@ class CreationForm(UserCreationForm):
     class Meta(UserCreationForm.Meta):
         model = User
         fields = ('first_name', 'last_name', 'username', 'email')
+
+    def clean_username(self):
+        username = self.cleaned_data['username']
+        # Профиль живёт по адресу /<username>/, поэтому имена вроде
+        # search или follow заняты служебными страницами.
+        match = resolve(reverse('posts:profile', args=[username]))
+        if match.view_name != 'posts:profile':
+            raise forms.ValidationError('Это имя зарезервировано')
+        return username
@@ -0,0 +1,246 @@
+import os
+import pickle
+import sqlite3
+import threading
+import time
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache (
+    key TEXT PRIMARY KEY,
+    value BLOB NOT NULL,
+    expires REAL,
+    accessed REAL NOT NULL,
+    size INTEGER NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS cache_accessed ON cache (accessed);
+CREATE TABLE IF NOT EXISTS cache_size (
+    id INTEGER PRIMARY KEY CHECK (id = 0),
+    total INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO cache_size (id, total) VALUES (0, 0);
+CREATE TRIGGER IF NOT EXISTS cache_size_insert AFTER INSERT ON cache
+BEGIN
+    UPDATE cache_size SET total = total + NEW.size;
+END;
+CREATE TRIGGER IF NOT EXISTS cache_size_update AFTER UPDATE OF size ON cache
+BEGIN
+    UPDATE cache_size SET total = total + NEW.size - OLD.size;
+END;
+CREATE TRIGGER IF NOT EXISTS cache_size_delete AFTER DELETE ON cache
+BEGIN
+    UPDATE cache_size SET total = total - OLD.size;
+END;
+"""
+
+
+class SQLiteCache(BaseCache):
+    """Кэш в файле SQLite, общий для всех процессов одного хоста.
+
+    Каждый поток открывает своё соединение в режиме WAL, поэтому
+    чтения не блокируют друг друга, а запись (в том числе ``incr``)
+    атомарна на уровне одной транзакции SQLite. Целые числа хранятся
+    без сериализации, чтобы ``incr`` выполнялся одним ``UPDATE``.
+    Объём ограничен ``OPTIONS['MAX_BYTES']``: при превышении вытесняются
+    давно не читавшиеся ключи (приближённый LRU, время доступа
+    обновляется не чаще раза в ``ACCESS_RESOLUTION`` секунд).
+    """
+    ACCESS_RESOLUTION = 1.0
+    MAX_VARIABLES = 500
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get('OPTIONS', {})
+        self._path = location
+        self._max_bytes = int(options.get('MAX_BYTES', 64 * 1024 * 1024))
+        self._evict_fraction = float(options.get('EVICT_FRACTION', 0.1))
+        self._local = threading.local()
+
+    @property
+    def _db(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None or self._local.pid != os.getpid():
+            directory = os.path.dirname(self._path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            connection = sqlite3.connect(
+                self._path, timeout=30, isolation_level=None,
+                check_same_thread=False
+            )
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            connection.executescript(SCHEMA)
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
+
+    @staticmethod
+    def _encode(value):
+        if type(value) is int:
+            return value
+        return pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+
+    @staticmethod
+    def _decode(value):
+        if isinstance(value, int):
+            return value
+        return pickle.loads(value)
+
+    def _key(self, key, version):
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        return key
+
+    def _write(self, key, value, timeout, replace):
+        now = time.time()
+        value = self._encode(value)
+        size = len(key) + (8 if isinstance(value, int) else len(value))
+        expires = self.get_backend_timeout(timeout)
+        db = self._db
+        db.execute('BEGIN IMMEDIATE')
+        try:
+            if not replace:
+                exists = db.execute(
+                    'SELECT 1 FROM cache WHERE key = ? '
+                    'AND (expires IS NULL OR expires > ?)',
+                    (key, now)
+                ).fetchone()
+                if exists:
+                    db.execute('COMMIT')
+                    return False
+            db.execute(
+                'INSERT OR REPLACE INTO cache '
+                '(key, value, expires, accessed, size) '
+                'VALUES (?, ?, ?, ?, ?)',
+                (key, value, expires, now, size)
+            )
+            self._evict(db, now)
+            db.execute('COMMIT')
+        except BaseException:
+            db.execute('ROLLBACK')
+            raise
+        return True
+
+    def _evict(self, db, now):
+        total, = db.execute('SELECT total FROM cache_size').fetchone()
+        if total <= self._max_bytes:
+            return
+        db.execute(
+            'DELETE FROM cache WHERE expires IS NOT NULL AND expires <= ?',
+            (now,)
+        )
+        count, = db.execute('SELECT COUNT(*) FROM cache').fetchone()
+        batch = max(1, int(count * self._evict_fraction))
+        while True:
+            total, = db.execute('SELECT total FROM cache_size').fetchone()
+            if total <= self._max_bytes:
+                break
+            db.execute(
+                'DELETE FROM cache WHERE key IN ('
+                'SELECT key FROM cache ORDER BY accessed LIMIT ?)',
+                (batch,)
+            )
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        return self._write(self._key(key, version), value, timeout, False)
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self._write(self._key(key, version), value, timeout, True)
+
+    def get(self, key, default=None, version=None):
+        key = self._key(key, version)
+        now = time.time()
+        row = self._db.execute(
+            'SELECT value, accessed FROM cache WHERE key = ? '
+            'AND (expires IS NULL OR expires > ?)',
+            (key, now)
+        ).fetchone()
+        if row is None:
+            return default
+        value, accessed = row
+        if now - accessed > self.ACCESS_RESOLUTION:
+            self._db.execute(
+                'UPDATE cache SET accessed = ? WHERE key = ?', (now, key)
+            )
+        return self._decode(value)
+
+    def get_many(self, keys, version=None):
+        keys = {self._key(key, version): key for key in keys}
+        now = time.time()
+        found = {}
+        stale = []
+        for chunk in self._chunks(list(keys)):
+            rows = self._db.execute(
+                'SELECT key, value, accessed FROM cache WHERE key IN (%s) '
+                'AND (expires IS NULL OR expires > ?)'
+                % ', '.join('?' * len(chunk)),
+                (*chunk, now)
+            )
+            for key, value, accessed in rows:
+                found[keys[key]] = self._decode(value)
+                if now - accessed > self.ACCESS_RESOLUTION:
+                    stale.append(key)
+        for chunk in self._chunks(stale):
+            self._db.execute(
+                'UPDATE cache SET accessed = ? WHERE key IN (%s)'
+                % ', '.join('?' * len(chunk)),
+                (now, *chunk)
+            )
+        return found
+
+    def _chunks(self, keys):
+        # Старые сборки SQLite принимают не больше 999 параметров запроса.
+        for start in range(0, len(keys), self.MAX_VARIABLES):
+            yield keys[start:start + self.MAX_VARIABLES]
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        cursor = self._db.execute(
+            'UPDATE cache SET expires = ? WHERE key = ? '
+            'AND (expires IS NULL OR expires > ?)',
+            (self.get_backend_timeout(timeout), self._key(key, version),
+             time.time())
+        )
+        return cursor.rowcount > 0
+
+    def delete(self, key, version=None):
+        self._db.execute(
+            'DELETE FROM cache WHERE key = ?', (self._key(key, version),)
+        )
+
+    def has_key(self, key, version=None):
+        return self._db.execute(
+            'SELECT 1 FROM cache WHERE key = ? '
+            'AND (expires IS NULL OR expires > ?)',
+            (self._key(key, version), time.time())
+        ).fetchone() is not None
+
+    def incr(self, key, delta=1, version=None):
+        key = self._key(key, version)
+        db = self._db
+        db.execute('BEGIN IMMEDIATE')
+        try:
+            cursor = db.execute(
+                "UPDATE cache SET value = value + ? WHERE key = ? "
+                "AND typeof(value) = 'integer' "
+                "AND (expires IS NULL OR expires > ?)",
+                (delta, key, time.time())
+            )
+            if cursor.rowcount == 0:
+                raise ValueError("Key '%s' not found" % key)
+            value, = db.execute(
+                'SELECT value FROM cache WHERE key = ?', (key,)
+            ).fetchone()
+            db.execute('COMMIT')
+        except BaseException:
+            db.execute('ROLLBACK')
+            raise
+        return value
+
+    def clear(self):
+        self._db.execute('DELETE FROM cache')
+
+    def close(self, **kwargs):
+        # Соединения живут весь срок потока: открывать файл на каждый
+        # запрос дороже, чем держать его открытым.
+        pass
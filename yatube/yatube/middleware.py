@@ -0,0 +1,238 @@
+import json
+import logging
+import random
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connections
+from django.template.backends.django import Template
+
+from . import routers
+
+logger = logging.getLogger('yatube.timing')
+_state = threading.local()
+_patch_lock = threading.Lock()
+# Число замеряемых запросов, идущих сейчас, и снятые обёртками атрибуты:
+# (класс, имя, исходное значение в ``__dict__`` класса или MISSING).
+_active = 0
+_originals = []
+MISSING = object()
+
+
+class Timing:
+    """Замеры одного запроса: SQL, шаблоны и кэш."""
+
+    def __init__(self):
+        self.queries = 0
+        self.db = 0.0
+        self.template = 0.0
+        self.cache = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        # Внутри замеряемого чтения кэша: ``BaseCache.get_many`` читает
+        # ключи через ``get``, и вложенные вызовы не считаются повторно.
+        self.in_cache = False
+
+    def execute(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db += time.perf_counter() - started
+            self.queries += 1
+
+    def header(self, total):
+        return ', '.join((
+            f'db;dur={self.db * 1000:.1f};desc="{self.queries} queries"',
+            f'tpl;dur={self.template * 1000:.1f}',
+            f'cache;dur={self.cache * 1000:.1f};'
+            f'desc="{self.cache_hits} hits, {self.cache_misses} misses"',
+            f'total;dur={total * 1000:.1f}',
+        ))
+
+    def record(self, request, response, total):
+        return {
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'queries': self.queries,
+            'db_ms': round(self.db * 1000, 2),
+            'template_ms': round(self.template * 1000, 2),
+            'cache_hits': self.cache_hits,
+            'cache_misses': self.cache_misses,
+            'cache_ms': round(self.cache * 1000, 2),
+            'total_ms': round(total * 1000, 2),
+        }
+
+
+def current():
+    return getattr(_state, 'timing', None)
+
+
+def _timed_render(render):
+    def wrapper(self, *args, **kwargs):
+        timing = current()
+        if timing is None:
+            return render(self, *args, **kwargs)
+        started = time.perf_counter()
+        try:
+            return render(self, *args, **kwargs)
+        finally:
+            timing.template += time.perf_counter() - started
+    wrapper.timed = True
+    return wrapper
+
+
+def _timed_get(get):
+    def wrapper(self, key, default=None, version=None):
+        timing = current()
+        if timing is None or timing.in_cache:
+            return get(self, key, default, version)
+        started = time.perf_counter()
+        timing.in_cache = True
+        try:
+            value = get(self, key, MISSING, version)
+        finally:
+            timing.in_cache = False
+            timing.cache += time.perf_counter() - started
+        if value is MISSING:
+            timing.cache_misses += 1
+            return default
+        timing.cache_hits += 1
+        return value
+    wrapper.timed = True
+    return wrapper
+
+
+def _timed_get_many(get_many):
+    def wrapper(self, keys, version=None):
+        timing = current()
+        if timing is None or timing.in_cache:
+            return get_many(self, keys, version)
+        keys = list(keys)
+        started = time.perf_counter()
+        timing.in_cache = True
+        try:
+            values = get_many(self, keys, version)
+        finally:
+            timing.in_cache = False
+            timing.cache += time.perf_counter() - started
+        timing.cache_hits += len(values)
+        timing.cache_misses += len(keys) - len(values)
+        return values
+    wrapper.timed = True
+    return wrapper
+
+
+def _patch(cls, name, wrap):
+    original = getattr(cls, name)
+    if getattr(original, 'timed', False):
+        return
+    _originals.append((cls, name, cls.__dict__.get(name, MISSING)))
+    setattr(cls, name, wrap(original))
+
+
+def _unpatch():
+    while _originals:
+        cls, name, original = _originals.pop()
+        if original is MISSING:
+            delattr(cls, name)
+        else:
+            setattr(cls, name, original)
+
+
+@contextmanager
+def instrumented():
+    """Оборачивает рендер шаблонов и чтение из настроенных кэшей на время
+    замеряемого запроса.
+
+    Обёртки ставятся на классы первым из одновременных замеряемых запросов
+    и снимаются последним, так что без выборки и без ``TimingMiddleware``
+    методы остаются исходными. В других потоках обёртки стоят одной
+    проверки thread-local. Вложенные ``{% include %}`` рендерятся внутри
+    шаблона верхнего уровня, поэтому время шаблонов не считается дважды.
+    """
+    global _active
+    with _patch_lock:
+        if not _active:
+            _patch(Template, 'render', _timed_render)
+            for alias in settings.CACHES:
+                backend = type(caches[alias])
+                _patch(backend, 'get', _timed_get)
+                _patch(backend, 'get_many', _timed_get_many)
+        _active += 1
+    try:
+        yield
+    finally:
+        with _patch_lock:
+            _active -= 1
+            if not _active:
+                _unpatch()
+
+
+class TimingMiddleware:
+    """Замеряет SQL, шаблоны, кэш и полное время обработки запроса.
+
+    Замеряется доля запросов ``TIMING_SAMPLE_RATE``; для них результаты
+    отдаются в заголовке ``Server-Timing`` и пишутся одной JSON-строкой
+    в журнал ``yatube.timing``.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if random.random() >= settings.TIMING_SAMPLE_RATE:
+            return self.get_response(request)
+        timing = Timing()
+        _state.timing = timing
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                stack.enter_context(instrumented())
+                for connection in connections.all():
+                    stack.enter_context(
+                        connection.execute_wrapper(timing.execute)
+                    )
+                response = self.get_response(request)
+        finally:
+            _state.timing = None
+        total = time.perf_counter() - started
+        response['Server-Timing'] = timing.header(total)
+        logger.info(json.dumps(
+            timing.record(request, response, total), sort_keys=True
+        ))
+        return response
+
+
+class ReplicaRoutingMiddleware:
+    """Отправляет чтение безопасных запросов на реплики.
+
+    После запроса, который что-то записал, браузер получает cookie
+    ``REPLICA_STICKY_COOKIE`` на ``REPLICA_STICKY_SECONDS`` секунд: пока
+    она жива, пользователь читает с основной базы и видит свои записи,
+    даже если реплика ещё не догнала основную базу.
+    """
+    SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        cookie = settings.REPLICA_STICKY_COOKIE
+        use_replica = (
+            request.method in self.SAFE_METHODS
+            and cookie not in request.COOKIES
+        )
+        routers.reset()
+        with routers.replica_reads(use_replica):
+            response = self.get_response(request)
+        if routers.wrote():
+            response.set_cookie(
+                cookie, '1', max_age=settings.REPLICA_STICKY_SECONDS,
+                httponly=True, samesite='Lax'
+            )
+        return response
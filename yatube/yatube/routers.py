@@ -0,0 +1,61 @@
+import random
+import threading
+from contextlib import contextmanager
+
+from django.conf import settings
+
+_state = threading.local()
+
+
+@contextmanager
+def replica_reads(enabled=True):
+    """Разрешает читать с реплик в пределах блока (обычно — GET-запроса).
+
+    Вне блока все запросы идут в основную базу: команды, фоновые потоки
+    и сигналы не должны видеть отстающую копию.
+    """
+    previous = getattr(_state, 'replica', False)
+    _state.replica = enabled
+    try:
+        yield
+    finally:
+        _state.replica = previous
+
+
+def pin_primary():
+    """Переводит чтение до конца блока на основную базу."""
+    _state.replica = False
+    _state.wrote = True
+
+
+def wrote():
+    return getattr(_state, 'wrote', False)
+
+
+def reset():
+    _state.wrote = False
+
+
+class PrimaryReplicaRouter:
+    """Пишет в ``default``, читает с реплик из ``REPLICA_DATABASES``.
+
+    Любая запись в потоке переключает последующие чтения на основную базу,
+    чтобы запрос видел то, что сам записал.
+    """
+
+    def db_for_read(self, model, **hints):
+        replicas = settings.REPLICA_DATABASES
+        if replicas and getattr(_state, 'replica', False):
+            return random.choice(replicas)
+        return 'default'
+
+    def db_for_write(self, model, **hints):
+        pin_primary()
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Реплики — копии основной базы, связи между ними допустимы.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == 'default'
@@ -23,6 +23,7 @@ INSTALLED_APPS = [
     'posts',
     'users',
     'about',
+    'api',
     'django.contrib.admin',
     'django.contrib.auth',
     'django.contrib.contenttypes',
@@ -33,6 +34,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'yatube.middleware.TimingMiddleware',
+    'yatube.middleware.ReplicaRoutingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -45,12 +48,22 @@ MIDDLEWARE = [
 ROOT_URLCONF = 'yatube.urls'
 
 TEMPLATES_DIR = os.path.join(BASE_DIR, "templates")
+TEMPLATE_LOADERS = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
+# Скомпилированные шаблоны кэшируются в процессе даже при DEBUG;
+# YATUBE_TEMPLATE_RELOAD=1 перечитывает их с диска на каждый рендер
+if not os.environ.get('YATUBE_TEMPLATE_RELOAD'):
+    TEMPLATE_LOADERS = [
+        ('django.template.loaders.cached.Loader', TEMPLATE_LOADERS),
+    ]
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [TEMPLATES_DIR],
-        'APP_DIRS': True,
         'OPTIONS': {
+            'loaders': TEMPLATE_LOADERS,
             'context_processors': [
                 'django.template.context_processors.debug',
                 'django.template.context_processors.request',
@@ -67,13 +80,38 @@ WSGI_APPLICATION = 'yatube.wsgi.application'
 
 # Database
 
+# Профиль соединения SQLite (см. yatube/sqlite/base.py): 'concurrent' —
+# WAL, mmap, busy_timeout и BEGIN IMMEDIATE; 'default' — как у Django
+SQLITE_PROFILE = os.environ.get('YATUBE_SQLITE_PROFILE', 'concurrent')
+
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
+        'ENGINE': 'yatube.sqlite',
         'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+        'OPTIONS': {'profile': SQLITE_PROFILE},
     }
 }
 
+# Реплики только для чтения, через запятую:
+# YATUBE_REPLICAS=/srv/replica1.sqlite3,/srv/replica2.sqlite3
+# Локально файлы реплик обновляет команда sync_replicas.
+REPLICA_DATABASES = []
+for index, name in enumerate(
+        filter(None, os.environ.get('YATUBE_REPLICAS', '').split(','))):
+    alias = f'replica_{index}'
+    DATABASES[alias] = {
+        'ENGINE': 'yatube.sqlite',
+        'NAME': name.strip(),
+        'OPTIONS': {'profile': SQLITE_PROFILE},
+        'TEST': {'MIRROR': 'default'},
+    }
+    REPLICA_DATABASES.append(alias)
+
+DATABASE_ROUTERS = ['yatube.routers.PrimaryReplicaRouter']
+# Сколько секунд после записи пользователь читает с основной базы
+REPLICA_STICKY_SECONDS = 5
+REPLICA_STICKY_COOKIE = 'read_primary'
+
 
 # Password validation
 
@@ -132,6 +170,39 @@ EMAIL_FILE_PATH = os.path.join(BASE_DIR, "sent_emails")
 
 # Constants
 POSTS_PAGINATOR = 10
+# Комментариев на странице поста и в каждой догрузке
+COMMENTS_PAGINATOR = 20
+# 'page' — нумерованные страницы (?page=N),
+# 'cursor' — курсорная пагинация по (pub_date, id) без COUNT и OFFSET
+POSTS_PAGINATION = 'page'
+# Сколько секунд хранится отрендеренная карточка поста; ключ карточки
+# меняется вместе с постом, так что срок нужен лишь для вытеснения
+POSTS_CARD_CACHE_TIMEOUT = 24 * 60 * 60
+# Людей на странице списков подписчиков и подписок
+FOLLOW_LIST_PAGINATOR = 50
+# Сколько рекомендаций «на кого подписаться» хранить каждому пользователю
+# и сколько из них показывать
+RECOMMENDATIONS_TOP_K = 20
+RECOMMENDATIONS_SHOWN = 5
+# Тренды: период полураспада активности в секундах, вес событий,
+# порог счёта, ниже которого compact_trending удаляет строку, окно
+# пересборки и число сообществ на странице трендов
+TRENDING_HALF_LIFE = 6 * 60 * 60
+TRENDING_WEIGHTS = {'post': 1.0, 'comment': 1.0, 'follow': 2.0}
+TRENDING_MIN_SCORE = 0.01
+TRENDING_WINDOW = 7 * 24 * 60 * 60
+TRENDING_GROUPS_SHOWN = 5
+# Просмотры постов копятся в памяти процесса и пишутся в базу пачкой,
+# когда наберётся столько просмотров или пройдёт столько секунд
+POST_VIEWS_FLUSH_THRESHOLD = 100
+POST_VIEWS_FLUSH_INTERVAL = 10
+# Сколько секунд живут версии кэша, если кэш у каждого процесса свой
+# (LocMem): столько другие воркеры могут не видеть чужих правок
+POSTS_LOCAL_VERSION_TIMEOUT = 20
+# Сколько пользователей держит в памяти процесса граф подписок
+FOLLOW_GRAPH_USERS = 10000
+# Потоки фоновой генерации миниатюр; 0 — строить сразу после коммита
+POSTS_THUMBNAIL_WORKERS = 2
 
 
 CACHES = {
@@ -139,3 +210,47 @@ CACHES = {
         'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
     }
 }
+
+# Общий для всех воркеров хоста кэш в файле SQLite: с ним инвалидация
+# в одном процессе сразу видна остальным. Без него версии кэша живут
+# POSTS_LOCAL_VERSION_TIMEOUT секунд.
+if os.environ.get('YATUBE_SHARED_CACHE'):
+    CACHES['default'] = {
+        'BACKEND': 'yatube.cache_backends.SQLiteCache',
+        'LOCATION': os.path.join(BASE_DIR, 'cache', 'cache.sqlite3'),
+        'OPTIONS': {
+            'MAX_BYTES': 256 * 1024 * 1024,
+        },
+    }
+
+# Доля запросов, для которых TimingMiddleware замеряет SQL, шаблоны и кэш
+# и отдаёт заголовок Server-Timing; по умолчанию выключено, в продакшене
+# включается через YATUBE_TIMING_SAMPLE_RATE
+TIMING_SAMPLE_RATE = float(os.environ.get('YATUBE_TIMING_SAMPLE_RATE', 0))
+
+# Замеры пишутся в журнал yatube.timing: в файл YATUBE_TIMING_LOG, если он
+# задан, иначе в stderr, отдельно от вывода приложения
+TIMING_HANDLER = {
+    'class': 'logging.StreamHandler',
+    'stream': 'ext://sys.stderr',
+}
+if os.environ.get('YATUBE_TIMING_LOG'):
+    TIMING_HANDLER = {
+        'class': 'logging.handlers.WatchedFileHandler',
+        'filename': os.environ['YATUBE_TIMING_LOG'],
+    }
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'timing': TIMING_HANDLER,
+    },
+    'loggers': {
+        'yatube.timing': {
+            'handlers': ['timing'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+    },
+}
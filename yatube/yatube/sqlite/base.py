@@ -0,0 +1,71 @@
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.sqlite3 import base
+
+# Именованные профили настроек соединения. Ключи — PRAGMA, кроме
+# ``immediate``: с ним транзакции открываются BEGIN IMMEDIATE, то есть
+# сразу берут блокировку записи и ждут её по busy_timeout, а не падают
+# с «database is locked» при попытке повысить блокировку чтения.
+# BEGIN IMMEDIATE ставится на каждый atomic(), в том числе только читающий
+# (например, ATOMIC_REQUESTS на GET), и такие блоки тоже по очереди ждут
+# единственную блокировку записи.
+PROFILES = {
+    # Поведение стандартного бэкенда Django.
+    'default': {},
+    # Несколько воркеров, одновременные чтения и записи.
+    'concurrent': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'busy_timeout': 5000,
+        'cache_size': -64000,
+        'mmap_size': 256 * 1024 * 1024,
+        'temp_store': 'MEMORY',
+        'immediate': True,
+    },
+    # То же, но каждая транзакция сразу сбрасывается на диск.
+    'durable': {
+        'journal_mode': 'WAL',
+        'synchronous': 'FULL',
+        'busy_timeout': 10000,
+        'cache_size': -64000,
+        'mmap_size': 256 * 1024 * 1024,
+        'immediate': True,
+    },
+}
+PRAGMA_ORDER = (
+    'busy_timeout', 'journal_mode', 'synchronous', 'cache_size',
+    'mmap_size', 'temp_store',
+)
+
+
+def get_profile(name):
+    try:
+        return PROFILES[name]
+    except KeyError:
+        raise ImproperlyConfigured(f'Неизвестный профиль SQLite: {name}')
+
+
+def apply_profile(connection, profile):
+    """Выполняет PRAGMA профиля на открытом соединении sqlite3."""
+    for pragma in PRAGMA_ORDER:
+        if pragma in profile:
+            connection.execute(f'PRAGMA {pragma} = {profile[pragma]}')
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """SQLite с профилем настроек из ``OPTIONS['profile']``."""
+
+    def get_connection_params(self):
+        kwargs = super().get_connection_params()
+        self.profile = get_profile(kwargs.pop('profile', 'default'))
+        return kwargs
+
+    def get_new_connection(self, conn_params):
+        connection = super().get_new_connection(conn_params)
+        apply_profile(connection, self.profile)
+        return connection
+
+    def _start_transaction_under_autocommit(self):
+        if self.profile.get('immediate'):
+            self.cursor().execute('BEGIN IMMEDIATE')
+        else:
+            super()._start_transaction_under_autocommit()
@@ -15,6 +15,8 @@ urlpatterns = [
     # импорт правил из приложения admin
     path('admin/', admin.site.urls),
     path('about/', include('about.urls', namespace='about')),
+    # JSON API только для чтения; версия в адресе
+    path('api/v1/', include('api.urls', namespace='api')),
     # импорт правил из приложения posts
     path('', include('posts.urls', namespace='posts'))
 ]